@@ -1,36 +1,70 @@
-from .components.tts import TTS
-from .components.stt import STT
-from .keybinder import KeyBinder
+import time
+_LAUNCHED = time.perf_counter()
 
+import argparse
+from .components.lazy import LazyComponent
+from .keybinder import KeyBinder, DROP
+_IMPORTED = time.perf_counter()
 
-def main():
-    tts = TTS()
-    stt = STT()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hotkeys for text-to-speech (F8, Ctrl+F8) and speech-to-text (F1)")
+    parser.add_argument('--profile-startup', action='store_true', help='Print import and model-load timings per component')
+    parser.add_argument('--daemon', nargs='?', const='http://127.0.0.1:8765', metavar='URL',
+                        help='Use the models held by a running HID.components.daemon instead of loading them here')
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        tts = LazyComponent('TTS', f'{__package__}.components.client', 'RemoteTTS', args.daemon)
+        stt = LazyComponent('STT', f'{__package__}.components.client', 'remote_stt', args.daemon)
+    else:
+        # Both models start loading in the background right away; handlers wait for the one they need
+        tts = LazyComponent('TTS', f'{__package__}.components.tts', 'TTS')
+        stt = LazyComponent('STT', f'{__package__}.components.stt', 'STT')
     binder = KeyBinder()
 
+    if args.profile_startup:
+        print(f"[startup] base imports {_IMPORTED - _LAUNCHED:.2f}s")
+
+        def report(component: LazyComponent):
+            error = component.future.exception()
+            if error:
+                print(f"[startup] {component.name} failed to load: {error}")
+                return
+            print(f"[startup] {component.name}: import {component.import_time:.2f}s, model load {component.load_time:.2f}s, "
+                  f"ready {time.perf_counter() - _LAUNCHED:.2f}s after launch")
+        tts.on_ready(report)
+        stt.on_ready(report)
+
     def speak_test():
         text = "This is a test of the TTS system."
-        samples = tts.list_voice_samples()
+        model = tts.get()
+        samples = model.list_voice_samples()
         sample = samples[0] if samples else None
-        tts.synthesize(text, voice=sample, play=True, save=False)
+        model.synthesize(text, voice=sample, play=True, save=False)
         print('Spoke (not saved)')
 
     def speak_and_save():
         text = "This is a saved TTS test."
-        samples = tts.list_voice_samples()
+        model = tts.get()
+        samples = model.list_voice_samples()
         sample = samples[0] if samples else None
-        out = tts.synthesize(text, voice=sample, play=True, save=True)
+        out = model.synthesize(text, voice=sample, play=True, save=True)
         print(f'Spoke and saved to {out}')
 
     def stt_test():
+        model = stt.get()
         print("Speak into the microphone. Press Ctrl+C to stop recording.")
-        text = stt.record_and_transcribe()
+        text = model.record_and_transcribe()
         print(f"You said: {text}")
 
-    binder.register('f8', speak_test)
-    binder.register('ctrl+f8', speak_and_save)
-    binder.register('f1', stt_test)
+    # Both speak through the one TTS model and the one output device, so they take turns
+    binder.register('f8', speak_test, group='tts')
+    binder.register('ctrl+f8', speak_and_save, group='tts')
+    binder.register('f1', stt_test, policy=DROP)  # Re-pressing F1 mid-recording should not queue another recording
+    if args.profile_startup:
+        print(f"[startup] hotkeys live {time.perf_counter() - _LAUNCHED:.2f}s after launch")
     binder.run()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
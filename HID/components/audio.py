@@ -0,0 +1,201 @@
+import hashlib
+import time
+import queue
+import threading
+from typing import Tuple
+import numpy as np
+import soundfile as sf
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Linearly resample a (frames, channels) float32 array. Good enough for speech at 16 kHz."""
+    if src_rate == dst_rate or len(audio) == 0:
+        return audio
+    n_out = int(round(len(audio) * dst_rate / src_rate))
+    src_t = np.arange(len(audio)) / src_rate
+    dst_t = np.arange(n_out) / dst_rate
+    out = np.empty((n_out, audio.shape[1]), dtype=np.float32)
+    for ch in range(audio.shape[1]):
+        out[:, ch] = np.interp(dst_t, src_t, audio[:, ch])
+    return out
+
+
+def to_mono(data: np.ndarray) -> np.ndarray:
+    """Collapse a (frames, channels) block to a 1-D float32 array."""
+    if data.ndim == 1:
+        return data.astype(np.float32, copy=False)
+    if data.shape[1] == 1:
+        return data[:, 0].astype(np.float32, copy=False)
+    return data.mean(axis=1, dtype=np.float32)
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_audio(path: str, samplerate: int = 16000) -> np.ndarray:
+    """Decode an audio file to mono float32 at `samplerate`, the layout Whisper expects."""
+    audio, file_rate = sf.read(path, dtype='float32', always_2d=True)
+    return np.ascontiguousarray(to_mono(resample(audio, file_rate, samplerate)))
+
+
+class WavInputStream:
+    """
+    Stand-in for sd.InputStream that plays a WAV file as if it were the microphone.
+    Supports the subset of the interface the recorders use: context manager and read(frames).
+    With realtime=True, read() sleeps so blocks arrive at the pace a real device would deliver them.
+    Once the file is exhausted read() returns an empty block and `exhausted` becomes True.
+    """
+    def __init__(self, path: str, samplerate: int = 16000, channels: int = 1, realtime: bool = False):
+        audio, file_rate = sf.read(path, dtype='float32', always_2d=True)
+        audio = resample(audio, file_rate, samplerate)
+        if audio.shape[1] != channels:
+            mono = to_mono(audio)[:, None]
+            audio = np.repeat(mono, channels, axis=1)
+        self.path = path
+        self.samplerate = samplerate
+        self.channels = channels
+        self.realtime = realtime
+        self._audio = audio
+        self._pos = 0
+        self._started = None
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pos >= len(self._audio)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read(self, frames: int) -> Tuple[np.ndarray, bool]:
+        data = self._audio[self._pos:self._pos + frames]
+        self._pos += len(data)
+        if self.realtime and self._started is not None:
+            due = self._started + self._pos / self.samplerate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data, False
+
+
+class RingBuffer:
+    """
+    Preallocated mono float32 buffer that keeps the most recent `capacity` samples.
+    Writes copy straight into the backing array, so recording never grows a list of blocks.
+    """
+    def __init__(self, capacity: int):
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._pos = 0  # Next write index
+        self._filled = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def __len__(self) -> int:
+        return self._filled
+
+    def clear(self):
+        self._pos = 0
+        self._filled = 0
+
+    def write(self, samples: np.ndarray):
+        cap = len(self._buf)
+        n = len(samples)
+        if n >= cap:
+            self._buf[:] = samples[-cap:]
+            self._pos = 0
+            self._filled = cap
+            return
+        first = min(n, cap - self._pos)
+        self._buf[self._pos:self._pos + first] = samples[:first]
+        if first < n:
+            self._buf[:n - first] = samples[first:]
+        self._pos = (self._pos + n) % cap
+        self._filled = min(self._filled + n, cap)
+
+    def view(self) -> np.ndarray:
+        """Buffered samples oldest first. A view of the backing array unless the buffer has wrapped."""
+        start = self._pos - self._filled
+        if start >= 0:
+            return self._buf[start:self._pos]
+        if self._pos == 0:
+            return self._buf[start:]
+        return np.concatenate((self._buf[start:], self._buf[:self._pos]))
+
+    def copy(self) -> np.ndarray:
+        """Like view(), but always safe to keep after the buffer is reused."""
+        audio = self.view()
+        return audio.copy() if audio.base is self._buf or audio is self._buf else audio
+
+
+class StreamPlayer:
+    """
+    Plays numpy chunks back to back through a single sd.OutputStream. The stream callback pulls from a
+    queue, so chunks queued while earlier ones are playing follow on without a gap. If the queue runs dry
+    the callback plays silence until more audio arrives or finish() is called.
+    """
+    def __init__(self, samplerate: int, blocksize: int = 0):
+        self._queue: "queue.Queue[np.ndarray]" = queue.Queue()
+        self._current = None
+        self._pos = 0
+        self._finished = False
+        self._done = threading.Event()
+        import sounddevice as sd  # Deferred so the file-based helpers here import without PortAudio
+        self._callback_stop = sd.CallbackStop
+        self._stream = sd.OutputStream(samplerate=samplerate, channels=1, dtype='float32', blocksize=blocksize,
+                                       callback=self._callback, finished_callback=self._done.set)
+
+    def __enter__(self):
+        self._stream.start()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.wait()
+        else:
+            self._stream.abort()
+        self._stream.close()
+        return False
+
+    def put(self, chunk: np.ndarray):
+        self._queue.put(np.asarray(chunk, dtype=np.float32).reshape(-1))
+
+    def finish(self):
+        """No more chunks are coming; the stream stops once the queue has played out."""
+        self._queue.put(None)
+
+    def wait(self):
+        self.finish()
+        self._done.wait()
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+        while filled < frames:
+            if self._current is None:
+                try:
+                    chunk = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if chunk is None:
+                    self._finished = True
+                    break
+                self._current, self._pos = chunk, 0
+            n = min(frames - filled, len(self._current) - self._pos)
+            out[filled:filled + n] = self._current[self._pos:self._pos + n]
+            filled += n
+            self._pos += n
+            if self._pos >= len(self._current):
+                self._current = None
+        out[filled:] = 0
+        if self._finished:
+            raise self._callback_stop
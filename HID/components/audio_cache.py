@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and unicode variants so trivially different strings share a cache entry."""
+    return " ".join(unicodedata.normalize('NFC', text).split())
+
+
+class AudioCache:
+    """
+    Content-addressed store for rendered speech. Audio is kept as int16 PCM appended to a single pack file
+    that is read through a memory map, with a JSON index of offsets next to it. Recently used clips are also
+    held in memory as float32. When the pack exceeds max_bytes the least recently used entries are dropped
+    and the pack is rewritten.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, memory_items: int = 64):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.pack_path = os.path.join(cache_dir, 'audio.pack')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._index = {}  # key -> {'offset': samples, 'length': samples, 'sr': int, 'used': timestamp}
+        self._map = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        if os.path.isfile(self.index_path) and os.path.isfile(self.pack_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                self._index = json.load(f)
+        atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(text: str, voice_digest: str, params: dict) -> str:
+        payload = json.dumps({'text': normalize_text(text), 'voice': voice_digest, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(entry['length'] for entry in self._index.values()) * 2
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Return (float32 audio, sample rate) or None, counting the hit or miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._index[key]['used'] = time.time()
+                self._dirty = True
+                self.hits += 1
+                return self._memory[key]
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            pcm = self._pcm()[entry['offset']:entry['offset'] + entry['length']]
+            audio = pcm.astype(np.float32) / 32768.0
+            entry['used'] = time.time()
+            self._dirty = True
+            self._remember(key, audio, entry['sr'])
+            self.hits += 1
+            return audio, entry['sr']
+
+    def put(self, key: str, audio: np.ndarray, sr: int):
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767.0).astype('<i2')
+        with self._lock:
+            offset = os.path.getsize(self.pack_path) // 2 if os.path.isfile(self.pack_path) else 0
+            with open(self.pack_path, 'ab') as f:
+                f.write(pcm.tobytes())
+            self._index[key] = {'offset': offset, 'length': len(pcm), 'sr': sr, 'used': time.time()}
+            self._remember(key, audio.astype(np.float32, copy=False), sr)
+            if self.size_bytes > self.max_bytes:
+                self._evict()
+            self._write_index()
+
+    def flush(self):
+        with self._lock:
+            if self._dirty:
+                self._write_index()
+
+    def _remember(self, key: str, audio: np.ndarray, sr: int):
+        self._memory[key] = (audio, sr)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _pcm(self) -> np.ndarray:
+        """Memory map of the pack, reopened whenever it has grown since the last map."""
+        size = os.path.getsize(self.pack_path) // 2
+        if self._map is None or len(self._map) != size:
+            self._map = np.memmap(self.pack_path, dtype='<i2', mode='r', shape=(size,)) if size else np.zeros(0, '<i2')
+        return self._map
+
+    def _evict(self):
+        """Drop least recently used entries down to 80% of the budget, then rewrite the pack without them."""
+        budget = int(self.max_bytes * 0.8) // 2
+        live = sorted(self._index.items(), key=lambda item: item[1]['used'], reverse=True)
+        keep = {}
+        total = 0
+        for key, entry in live:
+            if total + entry['length'] > budget:
+                continue
+            keep[key] = entry
+            total += entry['length']
+        for key in set(self._index) - set(keep):
+            self._memory.pop(key, None)
+        old = self._pcm()
+        tmp_path = self.pack_path + '.tmp'
+        offset = 0
+        with open(tmp_path, 'wb') as f:
+            for entry in sorted(keep.values(), key=lambda e: e['offset']):
+                f.write(old[entry['offset']:entry['offset'] + entry['length']].tobytes())
+                entry['offset'] = offset
+                offset += entry['length']
+        self._map = None
+        del old  # Windows cannot replace a file that is still mapped
+        os.replace(tmp_path, self.pack_path)
+        self._index = keep
+
+    def _write_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
@@ -0,0 +1,214 @@
+from dataclasses import dataclass, field
+from typing import Optional, List, Iterator, Set
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from bisect import bisect_right
+import glob
+import json
+import os
+import time
+import numpy as np
+import faster_whisper
+from faster_whisper import decode_audio
+from .audio import file_digest
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg', '.opus', '.aac', '.webm', '.mp4')
+# BatchedInferencePipeline slices audio with clip_timestamps as sample indices up to 1.1.x; from 1.2 it
+# expects seconds and converts them to samples itself
+CLIPS_IN_SECONDS = tuple(int(n) for n in faster_whisper.__version__.split('.')[:2]) >= (1, 2)
+
+
+@dataclass
+class BatchItem:
+    path: str
+    digest: str
+    audio: Optional[np.ndarray] = None  # None if the file was skipped or failed to decode
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    files: int = 0
+    skipped: int = 0
+    failed: int = 0
+    audio_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    rtfs: List[float] = field(default_factory=list)
+
+    @property
+    def speed(self) -> float:
+        """Seconds of audio transcribed per second of wall time."""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+
+def find_audio(pattern: str) -> List[str]:
+    """A directory is searched recursively for audio files; anything else is treated as a glob."""
+    if os.path.isdir(pattern):
+        paths = []
+        for root, _, files in os.walk(pattern):
+            paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(AUDIO_EXTENSIONS))
+    else:
+        paths = [p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p)]
+    return sorted(paths)
+
+
+def load_done(out_path: str) -> Set[str]:
+    """Content hashes already present in a results file, so a rerun resumes where it stopped."""
+    done = set()
+    if not os.path.isfile(out_path):
+        return done
+    with open(out_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)['hash'])
+            except (ValueError, KeyError):
+                continue  # A line cut short by an interrupted run
+    return done
+
+
+def format_timestamp(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def format_srt(segments: List[dict]) -> str:
+    blocks = []
+    for i, seg in enumerate(segments, 1):
+        blocks.append(f"{i}\n{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n{seg['text']}\n")
+    return "\n".join(blocks)
+
+
+def _prepare(path: str, done: Set[str], sample_rate: int) -> BatchItem:
+    digest = file_digest(path)
+    if digest in done:
+        return BatchItem(path, digest)
+    try:
+        return BatchItem(path, digest, decode_audio(path, sampling_rate=sample_rate))
+    except Exception as e:
+        return BatchItem(path, digest, error=str(e))
+
+
+def _decoded(paths: List[str], done: Set[str], sample_rate: int, workers: int) -> Iterator[BatchItem]:
+    """Decode in a thread pool, in input order, keeping only a few files ahead of the model."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(_prepare, path, done, sample_rate))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def transcribe_items(stt, items: List[BatchItem], language: Optional[str] = None, beam_size: Optional[int] = None) -> List[List[dict]]:
+    """
+    Transcribe short files (at most one Whisper window each) in a single batched call: the files are laid
+    end to end and each one becomes its own clip, so BatchedInferencePipeline runs them as one batch.
+    Segments are mapped back to their file by timestamp.
+    """
+    sr = stt.config.sample_rate
+    starts = []
+    clips = []
+    pos = 0
+    for item in items:
+        starts.append(pos / sr)
+        clips.append({'start': pos, 'end': pos + len(item.audio)})
+        pos += len(item.audio)
+    if CLIPS_IN_SECONDS:
+        clips = [{'start': clip['start'] / sr, 'end': clip['end'] / sr} for clip in clips]
+    audio = np.concatenate([item.audio for item in items]) if len(items) > 1 else items[0].audio
+    segments, info = stt.pipeline.transcribe(audio, language=language, vad_filter=False, clip_timestamps=clips,
+                                             batch_size=stt.config.batch_size, beam_size=beam_size or stt.config.beam_size)
+    results: List[List[dict]] = [[] for _ in items]
+    for seg in segments:
+        i = max(bisect_right(starts, (seg.start + seg.end) / 2) - 1, 0)
+        offset = starts[i]
+        results[i].append({'start': max(seg.start - offset, 0.0), 'end': max(seg.end - offset, 0.0), 'text': seg.text.strip()})
+    return results
+
+
+def transcribe_long(stt, item: BatchItem, language: Optional[str] = None) -> List[dict]:
+    """Files longer than one window are split by the pipeline's own VAD and batched internally."""
+    segments, info = stt.pipeline.transcribe(item.audio, language=language, batch_size=stt.config.batch_size,
+                                             beam_size=stt.config.beam_size)
+    return [{'start': seg.start, 'end': seg.end, 'text': seg.text.strip()} for seg in segments]
+
+
+def transcribe_batch(stt, paths: List[str], out_path: str, srt_dir: Optional[str] = None,
+                     workers: int = 4, language: Optional[str] = None, window: float = 30.0) -> BatchReport:
+    """
+    Transcribe many files, appending one JSON line per file to out_path and optionally an .srt per file.
+    Files whose content hash is already in out_path are skipped, so an interrupted run can be restarted.
+    """
+    sr = stt.config.sample_rate
+    done = load_done(out_path)
+    if srt_dir:
+        os.makedirs(srt_dir, exist_ok=True)
+    report = BatchReport()
+    started = time.perf_counter()
+    pack: List[BatchItem] = []
+
+    with open(out_path, 'a', encoding='utf-8') as out:
+        def emit(items: List[BatchItem], results: List[List[dict]], elapsed: float):
+            total = sum(len(item.audio) for item in items) / sr
+            for item, segments in zip(items, results):
+                duration = len(item.audio) / sr
+                # A batched call has one timing, so every file in it gets the pack's real-time factor
+                rtf = elapsed / total if total else 0.0
+                record = {
+                    'path': item.path,
+                    'hash': item.digest,
+                    'duration': round(duration, 3),
+                    'text': " ".join(seg['text'] for seg in segments).strip(),
+                    'segments': segments,
+                    'rtf': round(rtf, 4),
+                }
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if srt_dir:
+                    stem = os.path.splitext(os.path.basename(item.path))[0]
+                    with open(os.path.join(srt_dir, f"{stem}.{item.digest[:8]}.srt"), 'w', encoding='utf-8') as f:
+                        f.write(format_srt(segments))
+                done.add(item.digest)
+                report.files += 1
+                report.audio_seconds += duration
+                report.rtfs.append(rtf)
+                print(f"{item.path}: {duration:.1f}s, RTF {rtf:.3f}")
+            out.flush()
+
+        def flush_pack():
+            if not pack:
+                return
+            start = time.perf_counter()
+            results = transcribe_items(stt, pack, language=language)
+            emit(pack, results, time.perf_counter() - start)
+            pack.clear()
+
+        for item in _decoded(paths, done, sr, workers):
+            if item.error:
+                report.failed += 1
+                print(f"Failed to decode {item.path}: {item.error}")
+                continue
+            if item.audio is None or item.digest in done:
+                report.skipped += 1
+                continue
+            if not len(item.audio):
+                continue
+            done.add(item.digest)  # Duplicate content later in the same run is skipped too
+            if len(item.audio) > window * sr:
+                start = time.perf_counter()
+                segments = transcribe_long(stt, item, language=language)
+                emit([item], [segments], time.perf_counter() - start)
+                continue
+            pack.append(item)
+            if len(pack) >= stt.config.batch_size:
+                flush_pack()
+        flush_pack()
+
+    report.wall_seconds = time.perf_counter() - started
+    print(f"Transcribed {report.files} files ({report.audio_seconds / 60:.1f} min of audio) in {report.wall_seconds:.1f}s: "
+          f"{report.speed:.1f}x realtime, {report.files / report.wall_seconds if report.wall_seconds else 0:.2f} files/s. "
+          f"Skipped {report.skipped}, failed {report.failed}.")
+    return report
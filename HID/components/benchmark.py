@@ -0,0 +1,117 @@
+from dataclasses import dataclass, replace
+from typing import Optional, List
+import argparse
+import itertools
+import time
+from .audio import load_audio
+from .stt import STT, STTConfig
+from .tts import TTS, TTSConfig
+
+BENCH_TEXT = "Managing time effectively is an important skill, but life's ups and downs can throw off our plans."
+
+
+@dataclass
+class BenchResult:
+    component: str
+    settings: str
+    load_seconds: float = 0.0
+    audio_seconds: float = 0.0
+    compute_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def rtf(self) -> float:
+        """Real-time factor: compute time per second of audio. Lower is faster; below 1 is faster than realtime."""
+        return self.compute_seconds / self.audio_seconds if self.audio_seconds else float('inf')
+
+
+def bench_stt(config: STTConfig, audio, repeats: int = 3) -> BenchResult:
+    settings = f"{config.model_name} {config.device}/{config.compute_type} threads={config.cpu_threads} beam={config.beam_size}"
+    result = BenchResult('stt', settings)
+    try:
+        start = time.perf_counter()
+        stt = STT(config)
+        result.load_seconds = time.perf_counter() - start
+        result.settings = f"{config.model_name} {stt.device}/{stt.compute_type} threads={config.cpu_threads} beam={config.beam_size}"
+        list(stt.pipeline.transcribe(audio[:config.sample_rate], beam_size=config.beam_size)[0])  # Warm-up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            segments, _ = stt.pipeline.transcribe(audio, beam_size=config.beam_size)
+            list(segments)  # Segments are generated lazily
+        result.compute_seconds = time.perf_counter() - start
+        result.audio_seconds = repeats * len(audio) / config.sample_rate
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def bench_tts(config: TTSConfig, text: str = BENCH_TEXT, repeats: int = 2) -> BenchResult:
+    settings = f"{config.device} threads={config.torch_threads} quantize={config.quantize}"
+    result = BenchResult('tts', settings)
+    try:
+        start = time.perf_counter()
+        tts = TTS(replace(config, cache_dir=None))  # Measure generation, not cache hits
+        result.load_seconds = time.perf_counter() - start
+        result.settings = f"{tts.device} threads={config.torch_threads} quantize={config.quantize}"
+        tts.synthesize("Warm up.", play=False)
+        samples = 0
+        start = time.perf_counter()
+        for _ in range(repeats):
+            samples += sum(len(chunk) for chunk in tts.synthesize_iter(text))
+        result.compute_seconds = time.perf_counter() - start
+        result.audio_seconds = samples / tts.model.sr
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def print_result(r: BenchResult):
+    if r.error:
+        print(f"{r.component}  {r.settings:<45} failed: {r.error}")
+    else:
+        print(f"{r.component}  {r.settings:<45} load {r.load_seconds:6.1f}s  RTF {r.rtf:.3f}")
+
+
+def print_summary(results: List[BenchResult]):
+    for component in ('stt', 'tts'):
+        ok = [r for r in results if r.component == component and not r.error]
+        if ok:
+            best = min(ok, key=lambda r: r.rtf)
+            print(f"Fastest {component}: {best.settings} (RTF {best.rtf:.3f})")
+
+
+def _csv(kind):
+    return lambda value: [kind(v) for v in value.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure STT and TTS real-time factor across device, precision and thread settings")
+    parser.add_argument('wav', nargs='?', help='Speech sample for STT (omit to skip STT)')
+    parser.add_argument('--model', default=STTConfig.model_name, help='Whisper model (default: %(default)s)')
+    parser.add_argument('--devices', type=_csv(str), default=['cpu'], help='Comma-separated, e.g. cpu,cuda (default: cpu)')
+    parser.add_argument('--compute-types', type=_csv(str), default=['int8', 'float32'], help='faster-whisper compute types (default: int8,float32)')
+    parser.add_argument('--threads', type=_csv(int), default=[0], help='CPU thread counts to try, 0 for library default (default: 0)')
+    parser.add_argument('--beam-sizes', type=_csv(int), default=[1, 5], help='(default: 1,5)')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--tts', action='store_true', help='Also benchmark Chatterbox with and without quantization')
+    args = parser.parse_args(argv)
+
+    results = []
+    if args.wav:
+        audio = load_audio(args.wav, STTConfig.sample_rate)
+        for device, compute_type, threads, beam in itertools.product(args.devices, args.compute_types, args.threads, args.beam_sizes):
+            config = STTConfig(model_name=args.model, device=device, compute_type=compute_type, cpu_threads=threads, beam_size=beam)
+            results.append(bench_stt(config, audio, args.repeats))
+            print_result(results[-1])
+    if args.tts:
+        for device, threads, quantize in itertools.product(args.devices, args.threads, (False, True)):
+            if quantize and device != 'cpu':
+                continue
+            config = TTSConfig(device=device, torch_threads=threads or None, quantize=quantize)
+            results.append(bench_tts(config, repeats=max(1, args.repeats - 1)))
+            print_result(results[-1])
+    print_summary(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+from collections import namedtuple
+from types import SimpleNamespace
+from typing import Optional
+import json
+import urllib.error
+import urllib.request
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+from .audio import load_audio
+from .daemon import DEFAULT_HOST, DEFAULT_PORT
+
+DEFAULT_URL = f'http://{DEFAULT_HOST}:{DEFAULT_PORT}'
+Segment = namedtuple('Segment', 'start end text')
+
+
+class DaemonError(RuntimeError):
+    pass
+
+
+def _request(url: str, data: Optional[bytes], headers: dict, timeout: float):
+    req = urllib.request.Request(url, data=data, headers=headers, method='GET' if data is None else 'POST')
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read(), resp.headers
+    except urllib.error.HTTPError as e:
+        raise DaemonError(f"{url}: {e.code} {e.read().decode('utf-8', 'replace')}") from e
+    except urllib.error.URLError as e:
+        raise DaemonError(f"Cannot reach the daemon at {url}: {e.reason}") from e
+
+
+def daemon_available(url: str = DEFAULT_URL, timeout: float = 0.5) -> bool:
+    try:
+        with urllib.request.urlopen(f'{url}/health', timeout=timeout):
+            return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+class RemotePipeline:
+    """Stands in for BatchedInferencePipeline: transcribe() sends the audio to the daemon."""
+    def __init__(self, url: str = DEFAULT_URL, sample_rate: int = 16000, timeout: float = 300.0):
+        self.url = url
+        self.sample_rate = sample_rate
+        self.timeout = timeout
+
+    def transcribe(self, audio, **options):
+        if isinstance(audio, str):
+            audio = load_audio(audio, self.sample_rate)
+        body = np.ascontiguousarray(audio, dtype='<f4').tobytes()
+        headers = {'Content-Type': 'application/octet-stream', 'X-Options': json.dumps(options)}
+        data, _ = _request(f'{self.url}/transcribe', body, headers, self.timeout)
+        result = json.loads(data)
+        segments = [Segment(s['start'], s['end'], s['text']) for s in result['segments']]
+        return iter(segments), SimpleNamespace(language=result.get('language'))
+
+
+def remote_stt(url: str = DEFAULT_URL, config=None):
+    """An STT whose recording, VAD and streaming run locally while the model runs in the daemon."""
+    from .stt import STT, STTConfig
+    config = config or STTConfig()
+    return STT(config, pipeline=RemotePipeline(url, config.sample_rate))
+
+
+class RemoteTTS:
+    """Thin TTS client. Same synthesize() call as TTS, with generation done by the daemon and playback done here."""
+    def __init__(self, url: str = DEFAULT_URL, output_path: str = 'chatterbox_out.wav', timeout: float = 300.0):
+        self.url = url
+        self.output_path = output_path
+        self.timeout = timeout
+
+    def list_voice_samples(self):
+        """The samples in the daemon's sample_dir, which is where it resolves voice names."""
+        data, _ = _request(f'{self.url}/voices', None, {}, self.timeout)
+        return json.loads(data)['voices']
+
+    def generate(self, text: str, voice: Optional[str] = None, **params):
+        """Return (float32 audio, sample rate)."""
+        body = json.dumps({'text': text, 'voice': voice, 'params': params}).encode('utf-8')
+        data, headers = _request(f'{self.url}/synthesize', body, {'Content-Type': 'application/json'}, self.timeout)
+        return np.frombuffer(data, dtype='<f4'), int(headers['X-Sample-Rate'])
+
+    def synthesize(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None, play: bool = True, save: bool = False, **params):
+        audio, sr = self.generate(text, voice, **params)
+        if play:
+            sd.play(audio, sr)
+            sd.wait()
+        if save:
+            out_path = output_path or self.output_path
+            sf.write(out_path, audio, sr)
+            return out_path
+        return None
@@ -0,0 +1,222 @@
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+import argparse
+import json
+import queue
+import threading
+import time
+import numpy as np
+from .lazy import LazyComponent
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+BATCHABLE = {'language', 'beam_size'}  # Requests with only these options can share one batched call
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ModelQueue:
+    """
+    Serializes requests to one model on a single worker thread. At most max_queue requests wait; more are
+    refused so clients get a quick error instead of an ever-growing backlog.
+    """
+    def __init__(self, name: str, component: LazyComponent, max_queue: int = 32):
+        self.name = name
+        self.component = component
+        self._queue: "queue.Queue[tuple[object, Future]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._loop, name=f'{name}-worker', daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, request) -> Future:
+        future = Future()
+        try:
+            self._queue.put_nowait((request, future))
+        except queue.Full:
+            raise QueueFull(f"{self.name} queue is full")
+        return future
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            try:
+                model = self.component.get()
+            except Exception as e:
+                first[1].set_exception(e)
+                continue
+            self.process(model, first)
+
+    def process(self, model, job):
+        request, future = job
+        try:
+            future.set_result(self.handle(model, request))
+        except Exception as e:
+            future.set_exception(e)
+
+    def handle(self, model, request):
+        raise NotImplementedError
+
+
+class STTQueue(ModelQueue):
+    """Transcription requests. Short clips that arrive together are transcribed in one batched pipeline call."""
+    def __init__(self, component: LazyComponent, max_queue: int = 32, batch_window: float = 0.02):
+        self.batch_window = batch_window
+        super().__init__('stt', component, max_queue)
+
+    def process(self, model, job):
+        batch = [job]
+        if self._batchable(model, job):
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < model.config.batch_size:
+                try:
+                    nxt = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if self._batchable(model, nxt) and nxt[0][1] == job[0][1]:
+                    batch.append(nxt)
+                else:
+                    super().process(model, nxt)
+        if len(batch) == 1:
+            return super().process(model, job)
+        from .batch import BatchItem, transcribe_items
+        options = job[0][1]
+        items = [BatchItem('', '', audio) for (audio, _), _ in batch]
+        try:
+            results = transcribe_items(model, items, language=options.get('language'), beam_size=options.get('beam_size'))
+        except Exception as e:
+            # A failed batch shouldn't fail requests that would have succeeded alone
+            print(f"[WARN] Batched transcription of {len(batch)} requests failed ({type(e).__name__}: {e}); "
+                  f"transcribing them one at a time")
+            for item in batch:
+                super().process(model, item)
+            return
+        for (_, future), segments in zip(batch, results):
+            future.set_result({'segments': segments, 'language': options.get('language')})
+
+    @staticmethod
+    def _batchable(model, job) -> bool:
+        audio, options = job[0]
+        return set(options) <= BATCHABLE and len(audio) <= 30 * model.config.sample_rate
+
+    def handle(self, model, request):
+        audio, options = request
+        segments, info = model.pipeline.transcribe(audio, **options)
+        return {
+            'segments': [{'start': s.start, 'end': s.end, 'text': s.text} for s in segments],
+            'language': getattr(info, 'language', None),
+        }
+
+
+class TTSQueue(ModelQueue):
+    def __init__(self, component: LazyComponent, max_queue: int = 32):
+        super().__init__('tts', component, max_queue)
+
+    def handle(self, model, request):
+        text, voice, params = request
+        chunks = list(model.synthesize_iter(text, voice=voice, **params))
+        audio = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        return audio.astype('<f4', copy=False), model.model.sr
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    GET  /health      -> {"stt": bool, "tts": bool, "queued": {...}}
+    GET  /voices      -> {"voices": [str]}, the WAV samples in the TTS model's sample_dir
+    POST /transcribe  body: float32 little-endian mono PCM at 16 kHz; X-Options header: JSON transcribe() kwargs
+                      -> {"segments": [{"start", "end", "text"}], "language": str}
+    POST /synthesize  body: {"text": str, "voice": str?, "params": {...}?}
+                      -> float32 little-endian PCM, sample rate in the X-Sample-Rate header
+    """
+    server_version = 'HIDDaemon/1.0'
+    stt: Optional[STTQueue] = None
+    tts: Optional[TTSQueue] = None
+
+    def log_message(self, fmt, *args):
+        pass  # One line per request is too noisy for hotkey traffic
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json', headers: Optional[dict] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload).encode('utf-8'))
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_GET(self):
+        if self.path == '/voices' and self.tts:
+            try:
+                return self._json(200, {'voices': self.tts.component.get().list_voice_samples()})
+            except Exception as e:
+                return self._json(500, {'error': str(e)})
+        if self.path != '/health':
+            return self._json(404, {'error': 'not found'})
+        queues = [q for q in (self.stt, self.tts) if q]
+        self._json(200, {
+            'stt': bool(self.stt and self.stt.component.ready()),
+            'tts': bool(self.tts and self.tts.component.ready()),
+            'queued': {q.name: q.depth for q in queues},
+        })
+
+    def do_POST(self):
+        try:
+            if self.path == '/transcribe' and self.stt:
+                audio = np.frombuffer(self._body(), dtype='<f4')
+                options = json.loads(self.headers.get('X-Options') or '{}')
+                self._json(200, self.stt.submit((audio, options)).result())
+            elif self.path == '/synthesize' and self.tts:
+                request = json.loads(self._body() or b'{}')
+                future = self.tts.submit((request['text'], request.get('voice'), request.get('params') or {}))
+                audio, sr = future.result()
+                self._send(200, audio.tobytes(), 'application/octet-stream', {'X-Sample-Rate': str(sr)})
+            else:
+                self._json(404, {'error': f'{self.path} is not served'})
+        except QueueFull as e:
+            self._json(503, {'error': str(e)})
+        except (KeyError, ValueError) as e:
+            self._json(400, {'error': f'bad request: {e}'})
+        except Exception as e:
+            self._json(500, {'error': str(e)})
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, stt: bool = True, tts: bool = True, max_queue: int = 32):
+    """Load the models once and serve them over HTTP on localhost until interrupted."""
+    package = __package__
+    Handler.stt = STTQueue(LazyComponent('STT', f'{package}.stt', 'STT'), max_queue) if stt else None
+    Handler.tts = TTSQueue(LazyComponent('TTS', f'{package}.tts', 'TTS'), max_queue) if tts else None
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    print(f"[INFO] Serving {'STT ' if stt else ''}{'TTS ' if tts else ''}on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[INFO] Daemon stopped.")
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hold one STT and one TTS model and serve them to local clients")
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Interface to bind (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='(default: %(default)s)')
+    parser.add_argument('--no-stt', action='store_true', help="Don't load the Whisper model")
+    parser.add_argument('--no-tts', action='store_true', help="Don't load the Chatterbox model")
+    parser.add_argument('--max-queue', type=int, default=32, help='Requests allowed to wait per model (default: %(default)s)')
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, stt=not args.no_stt, tts=not args.no_tts, max_queue=args.max_queue)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+def whisper_device(device: str = 'auto') -> str:
+    """Resolve 'auto' to 'cuda' when CTranslate2 can see a GPU, otherwise 'cpu'."""
+    if device != 'auto':
+        return device
+    import ctranslate2
+    return 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+
+
+def whisper_compute_type(compute_type: str, device: str) -> str:
+    """Resolve 'auto' to float16 on GPU and int8 on CPU, the fastest types each supports well."""
+    if compute_type != 'auto':
+        return compute_type
+    return 'float16' if device == 'cuda' else 'int8'
+
+
+def torch_device(device: str = 'auto') -> str:
+    """Resolve 'auto' to 'cuda', then 'mps', then 'cpu'."""
+    if device != 'auto':
+        return device
+    import torch
+    if torch.cuda.is_available():
+        return 'cuda'
+    if getattr(torch.backends, 'mps', None) and torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
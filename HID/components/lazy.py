@@ -0,0 +1,47 @@
+from concurrent.futures import Future
+from typing import Callable, Optional
+import importlib
+import threading
+import time
+
+
+class LazyComponent:
+    """
+    Imports `module` and builds `module.attr(*args, **kwargs)` on a background thread as soon as it is
+    created, so the caller can carry on (e.g. start listening for hotkeys) while a model loads.
+    get() blocks until the object is ready. Import and construction times are recorded separately.
+    """
+    def __init__(self, name: str, module: str, attr: str, *args, **kwargs):
+        self.name = name
+        self.future: Future = Future()
+        self.import_time: Optional[float] = None
+        self.load_time: Optional[float] = None
+        self._target = (module, attr, args, kwargs)
+        self._thread = threading.Thread(target=self._load, name=f'load-{name}', daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        module, attr, args, kwargs = self._target
+        try:
+            start = time.perf_counter()
+            factory = getattr(importlib.import_module(module), attr)
+            self.import_time = time.perf_counter() - start
+            start = time.perf_counter()
+            obj = factory(*args, **kwargs)
+            self.load_time = time.perf_counter() - start
+        except BaseException as e:
+            self.future.set_exception(e)
+            return
+        self.future.set_result(obj)
+
+    def ready(self) -> bool:
+        return self.future.done()
+
+    def get(self, timeout: Optional[float] = None):
+        if not self.future.done():
+            print(f"Waiting for {self.name} to load...")
+        return self.future.result(timeout)
+
+    def on_ready(self, callback: Callable[["LazyComponent"], None]):
+        """Call callback(self) once loading finishes, successfully or not."""
+        self.future.add_done_callback(lambda _: callback(self))
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import threading
+import numpy as np
+import sounddevice as sd
+from .audio import RingBuffer, load_audio, to_mono
+
+IDLE = 'idle'
+HOLDING = 'holding'  # Push-to-talk: recording until the key is released
+LATCHED = 'latched'  # Toggle: recording until the key is pressed again
+
+
+class PushToTalk:
+    """
+    Push-to-talk recorder driven by key events instead of polling. The microphone runs in callback mode and
+    always fills a short pre-roll buffer, so when the key goes down the last `preroll_ms` of audio is put in
+    front of the recording and the first syllable is not clipped. Key-down/key-up drive a small state machine;
+    a finished recording is handed to on_utterance(audio) on a worker thread, never on the hook or audio thread.
+    Between presses nothing runs except the audio callback copying blocks into the pre-roll.
+    """
+    def __init__(self, on_utterance: Callable[[np.ndarray], None], sample_rate: int = 16000,
+                 preroll_ms: int = 300, max_record_seconds: float = 300.0, block_size: int = 512):
+        self.on_utterance = on_utterance
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.state = IDLE
+        self._pressed = False  # Whether the key is physically down, so auto-repeat downs can be told apart
+        self.preroll = RingBuffer(int(sample_rate * preroll_ms / 1000))
+        self.recording = RingBuffer(int(sample_rate * max_record_seconds))
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ptt')
+        self._stream = None
+        self._hooks = []
+
+    # Audio side
+
+    def feed(self, block: np.ndarray):
+        """Audio callback body: keep the pre-roll current and append to the recording while one is active."""
+        mono = to_mono(block)
+        with self._lock:
+            self.preroll.write(mono)
+            if self.state != IDLE:
+                self.recording.write(mono)
+
+    def _callback(self, indata, frames, time_info, status):
+        self.feed(indata)
+
+    def start(self, stream=None):
+        """Open the microphone in callback mode (or use `stream`, any object with start/stop/close)."""
+        self._stream = stream or sd.InputStream(samplerate=self.sample_rate, channels=1, dtype='float32',
+                                                blocksize=self.block_size, callback=self._callback)
+        self._stream.start()
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        for remove in self._hooks:
+            remove()
+        self._hooks.clear()
+        self._worker.shutdown(wait=True)
+
+    def __enter__(self):
+        if self._stream is None:
+            self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # Key side
+
+    def key_down(self, latch: bool = False):
+        """Start recording (latched if `latch`), or finish a latched recording. Auto-repeat downs are ignored."""
+        with self._lock:
+            if self._pressed:
+                return  # Auto-repeat while held, in any state
+            self._pressed = True
+            if self.state == IDLE:
+                self.recording.clear()
+                self.recording.write(self.preroll.view())
+                self.state = LATCHED if latch else HOLDING
+                print("Recording...")
+                return
+            if self.state == LATCHED:
+                self._finish()
+
+    def key_up(self):
+        with self._lock:
+            self._pressed = False
+            if self.state == HOLDING:
+                self._finish()
+
+    def _finish(self):
+        # Called with the lock held. Copy so the buffer can take the next press while this one is transcribed.
+        self.state = IDLE
+        audio = self.recording.copy()
+        print("Recording stopped.")
+        if len(audio):
+            self._worker.submit(self._deliver, audio)
+        else:
+            print("No audio recorded.")
+
+    def _deliver(self, audio: np.ndarray):
+        try:
+            self.on_utterance(audio)
+        except Exception as e:
+            print(f"[ERROR] Handling recording failed: {e}")
+
+    def bind(self, key: str, toggle_modifier: Optional[str] = 'ctrl'):
+        """
+        Hook `key`: holding it records until release; pressing it with toggle_modifier held latches recording
+        until the next press.
+        """
+        import keyboard
+
+        def on_event(event):
+            if event.event_type == keyboard.KEY_DOWN:
+                self.key_down(latch=bool(toggle_modifier) and keyboard.is_pressed(toggle_modifier))
+            else:
+                self.key_up()
+        self._hooks.append(keyboard.hook_key(key, on_event))
+
+    # Testing
+
+    def simulate(self, path: str, events: List[Tuple[float, str]]):
+        """
+        Play a WAV through feed() block by block and fire scripted key events at the given audio times,
+        e.g. [(1.0, 'down'), (2.5, 'up')] or (t, 'latch') for a toggle tap (down and up). Waits for on_utterance calls.
+        """
+        audio = load_audio(path, self.sample_rate)
+        pending = sorted(events)
+        for pos in range(0, len(audio), self.block_size):
+            now = pos / self.sample_rate
+            while pending and pending[0][0] <= now:
+                self._fire(pending.pop(0)[1])
+            self.feed(audio[pos:pos + self.block_size])
+        for _, action in pending:
+            self._fire(action)
+        self._worker.submit(lambda: None).result()
+
+    def _fire(self, action: str):
+        if action == 'up':
+            self.key_up()
+        elif action == 'latch':
+            self.key_down(latch=True)
+            self.key_up()
+        else:
+            self.key_down()
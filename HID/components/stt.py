@@ -1,68 +1,338 @@
 from dataclasses import dataclass
-from typing import Optional, List
-import sounddevice as sd
+from typing import Optional, List, Iterator, Union, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
 import soundfile as sf
 import numpy as np
-from faster_whisper import WhisperModel, BatchedInferencePipeline
 import os
+import time
+from .audio import WavInputStream, RingBuffer, to_mono, load_audio
+import argparse
+from .vad import VADStats, EnergyVAD, make_vad, trim_silence
+from .device import whisper_device, whisper_compute_type
 
 @dataclass
 class STTConfig:
     model_name: str = 'base'
-    device: str = 'cuda'
+    device: str = 'auto'  # 'auto' picks cuda when available, else cpu
+    compute_type: str = 'auto'  # 'auto' is float16 on cuda, int8 on cpu; or int8_float16, float32, ...
+    cpu_threads: int = 0  # CTranslate2 intra-op threads on CPU; 0 uses its default
+    num_workers: int = 1  # Parallel transcriptions the model can serve
+    beam_size: int = 5
+    batch_size: int = 8  # Clips per forward pass in BatchedInferencePipeline
     sample_rate: int = 16000
     channels: int = 1
     temp_dir: str = 'HID/transcribe/tmp'
     default_record_filename: str = 'recording.wav'
+    block_size: int = 1024
+    max_record_seconds: float = 300.0  # Capture buffer size; longer recordings keep the most recent audio
+    save_recordings: bool = False  # Also write each capture to temp_dir in the background
+    vad: Optional[str] = None  # 'energy' or 'silero' to trim silence before transcribing
+    vad_threshold_db: float = -45.0  # Energy detector threshold; also used for auto-stop
+    vad_pad_ms: int = 200  # Audio kept either side of detected speech
+    vad_min_silence_ms: int = 300  # Pauses longer than this are compacted
+    auto_stop_ms: Optional[int] = None  # Stop recording after this much silence following speech
+    stream_step: float = 2.0  # Seconds of new audio between incremental transcriptions
+    stream_overlap: float = 1.0  # Trailing seconds kept unconfirmed so edge words can still change
+    stream_max_window: float = 30.0  # Force segments final once the window grows this long
+
+@dataclass
+class StreamSegment:
+    text: str
+    start: float  # Seconds since the stream started
+    end: float
+    final: bool  # False for a provisional tail that may still be revised
 
 class STT:
-    def __init__(self, config: STTConfig = STTConfig()):
+    def __init__(self, config: STTConfig = STTConfig(), pipeline=None):
+        """`pipeline` replaces the local model with anything that has transcribe(), e.g. a client for the daemon."""
         self.config = config
-        self.model = WhisperModel(config.model_name, device=config.device)
-        self.pipeline = BatchedInferencePipeline(model=self.model)
+        if pipeline is None:
+            from faster_whisper import WhisperModel, BatchedInferencePipeline  # Deferred so importing this module stays cheap
+            self.device = whisper_device(config.device)
+            self.compute_type = whisper_compute_type(config.compute_type, self.device)
+            self.model = WhisperModel(config.model_name, device=self.device, compute_type=self.compute_type,
+                                      cpu_threads=config.cpu_threads, num_workers=config.num_workers)
+            pipeline = BatchedInferencePipeline(model=self.model)
+        else:
+            self.device = self.compute_type = 'remote'
+            self.model = None
+        self.pipeline = pipeline
+        self.buffer = RingBuffer(int(config.sample_rate * config.max_record_seconds))
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self.vad = make_vad(config.vad, config.sample_rate, config.vad_threshold_db, config.vad_min_silence_ms) if config.vad else None
+        self.last_vad: Optional[VADStats] = None  # Stats from the most recent record_and_transcribe
+        self._speech_end = 0.0  # perf_counter() when the last voiced block of a capture arrived
         os.makedirs(self.config.temp_dir, exist_ok=True)
 
-    def record_audio(self, duration: Optional[float] = None, filename: Optional[str] = None) -> str:
+    def _open_input(self, source=None):
+        """Microphone by default; a WAV path or an object with read(frames) can stand in for it."""
+        if source is None:
+            import sounddevice as sd  # Only the microphone needs PortAudio
+            return sd.InputStream(samplerate=self.config.sample_rate, channels=self.config.channels)
+        if isinstance(source, str):
+            return WavInputStream(source, samplerate=self.config.sample_rate, channels=self.config.channels, realtime=True)
+        return source
+
+    def capture(self, duration: Optional[float] = None, source=None) -> np.ndarray:
+        """
+        Record from the microphone into the preallocated ring buffer and return mono float32 audio at
+        sample_rate, ready for the model. If duration is None, records until interrupted or, with
+        auto_stop_ms set, until that much silence follows speech.
+        The array may share memory with the buffer, so it is only valid until the next capture.
+        """
+        print(f"Recording audio{' for ' + str(duration) + ' seconds' if duration else ''}...")
+        self.buffer.clear()
+        sr = self.config.sample_rate
+        block = self.config.block_size
+        total_frames = int(sr * duration) if duration else None
+        detector = EnergyVAD(sr, threshold_db=self.config.vad_threshold_db) if self.config.auto_stop_ms else None
+        stop_after = int(sr * (self.config.auto_stop_ms or 0) / 1000)
+        heard_speech = False
+        silence = 0
+        recorded = 0
+        self._speech_end = time.perf_counter()
+        with self._open_input(source) as stream:
+            try:
+                while total_frames is None or recorded < total_frames:
+                    n = block if total_frames is None else min(block, total_frames - recorded)
+                    data, _ = stream.read(n)
+                    if len(data) == 0:
+                        break
+                    mono = to_mono(data)
+                    self.buffer.write(mono)
+                    recorded += len(mono)
+                    if detector is None:
+                        continue
+                    if detector.is_speech(mono):
+                        heard_speech = True
+                        silence = 0
+                        self._speech_end = time.perf_counter()
+                    elif heard_speech:
+                        silence += len(mono)
+                        if silence >= stop_after:
+                            print("Silence detected, recording stopped.")
+                            break
+            except KeyboardInterrupt:
+                print("Recording stopped by user.")
+        if detector is None:
+            self._speech_end = time.perf_counter()
+        audio = self.buffer.view()
+        if not len(audio):
+            print("No audio recorded.")
+        return audio
+
+    def save_async(self, audio: np.ndarray, filename: Optional[str] = None) -> Future:
+        """Write audio to temp_dir on a background thread. The future resolves to the file path."""
+        file_path = os.path.join(self.config.temp_dir, filename or self.config.default_record_filename)
+        audio = audio.copy()  # The capture buffer is reused by the next recording
+
+        def write():
+            sf.write(file_path, audio, self.config.sample_rate)
+            return file_path
+        return self._writer.submit(write)
+
+    def record_audio(self, duration: Optional[float] = None, filename: Optional[str] = None, source=None) -> str:
         """Record audio from the microphone. If duration is None, records until interrupted. Returns the file path."""
         filename = filename or self.config.default_record_filename
         file_path = os.path.join(self.config.temp_dir, filename)
-        print(f"Recording audio{' for ' + str(duration) + ' seconds' if duration else ''}...")
-        frames = []
-        with sd.InputStream(samplerate=self.config.sample_rate, channels=self.config.channels) as stream:
-            if duration:
-                total_frames = int(self.config.sample_rate * duration)
-                while len(frames) * 1024 < total_frames:
-                    data, _ = stream.read(1024)
-                    frames.append(data)
-            else:
-                try:
-                    while True:
-                        data, _ = stream.read(1024)
-                        frames.append(data)
-                except KeyboardInterrupt:
-                    print("Recording stopped by user.")
-        if frames:
-            audio = np.concatenate(frames, axis=0)
+        audio = self.capture(duration=duration, source=source)
+        if len(audio):
             sf.write(file_path, audio, self.config.sample_rate)
             print(f"Audio saved to {file_path}")
-        else:
-            print("No audio recorded.")
         return file_path
 
-    def transcribe(self, file_path: str) -> str:
-        """Transcribe the given audio file and return the text."""
-        segments, info = self.pipeline.transcribe(file_path)
+    def trim_silence(self, audio: np.ndarray) -> Tuple[np.ndarray, VADStats]:
+        """Drop lead-in, trailing and long pauses of silence using the configured VAD."""
+        if self.vad is None:
+            return audio, VADStats(total_samples=len(audio), kept_samples=len(audio))
+        return trim_silence(audio, self.vad, pad_ms=self.config.vad_pad_ms, min_silence_ms=self.config.vad_min_silence_ms)
+
+    def transcribe(self, audio: Union[str, np.ndarray]) -> str:
+        """Transcribe an audio file path or a mono float32 array at sample_rate and return the text."""
+        segments, info = self.pipeline.transcribe(audio, beam_size=self.config.beam_size)
         text = " ".join([segment.text for segment in segments]).strip()
         print(f"Transcription: {text}")
         return text
 
-    def record_and_transcribe(self, duration: Optional[float] = None, filename: Optional[str] = None) -> str:
-        """Record audio and return the transcription."""
-        file_path = self.record_audio(duration=duration, filename=filename)
-        return self.transcribe(file_path)
+    def record_and_transcribe(self, duration: Optional[float] = None, filename: Optional[str] = None, source=None) -> str:
+        """Record audio and return the transcription. Audio stays in memory; it is saved only if asked to."""
+        audio = self.capture(duration=duration, source=source)
+        if not len(audio):
+            return ""
+        if filename or self.config.save_recordings:
+            self.save_async(audio, filename)
+        speech, stats = self.trim_silence(audio)
+        text = self.transcribe(speech) if len(speech) else ""
+        stats.latency = time.perf_counter() - self._speech_end
+        self.last_vad = stats
+        if self.vad is not None:
+            print(f"VAD dropped {stats.dropped_ratio:.0%} of the audio; text ready {stats.latency * 1000:.0f} ms after speech ended.")
+        return text
+
+    def _transcribe_window(self, audio: np.ndarray) -> List[StreamSegment]:
+        segments, info = self.pipeline.transcribe(audio, beam_size=self.config.beam_size)
+        return [StreamSegment(s.text.strip(), s.start, s.end, False) for s in segments]
+
+    def transcribe_stream(self, duration: Optional[float] = None, source=None) -> Iterator[StreamSegment]:
+        """
+        Transcribe while recording. Audio accumulates in a rolling window that a background worker
+        re-transcribes every `stream_step` seconds. Segments ending before the last `stream_overlap`
+        seconds of the window are yielded as final and dropped from the window; the rest is yielded as
+        a single provisional segment. When recording stops only the unconfirmed tail is left to
+        transcribe, so the wait after speech ends is about one window rather than the whole clip.
+        `source` is passed to _open_input, so a WAV path can stand in for the microphone.
+        """
+        sr = self.config.sample_rate
+        block = self.config.block_size
+        step = int(self.config.stream_step * sr)
+        max_window = int(self.config.stream_max_window * sr)
+        total_frames = int(sr * duration) if duration else None
+
+        blocks: List[np.ndarray] = []  # Window audio not yet confirmed, starting at window_start
+        window_len = 0
+        window_start = 0  # Absolute sample index of the first sample in the window
+        recorded = 0
+        submitted_at = 0
+        pending = None  # (future, job_start, job_len)
+
+        def collapse() -> np.ndarray:
+            audio = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+            blocks[:] = [audio]
+            return audio
+
+        def settle(segments: List[StreamSegment], job_start: int, job_len: int, last: bool):
+            """Split a window result into final segments and a provisional tail; trim the window."""
+            nonlocal window_len, window_start
+            offset = job_start / sr
+            horizon = job_len / sr - self.config.stream_overlap
+            n_final = len(segments)
+            if not last:
+                n_final = 0
+                while n_final < len(segments) and segments[n_final].end <= horizon:
+                    n_final += 1
+                if n_final == 0 and segments and job_len >= max_window:
+                    n_final = max(1, len(segments) - 1)
+            out = []
+            for seg in segments[:n_final]:
+                out.append(StreamSegment(seg.text, offset + seg.start, offset + seg.end, True))
+            tail = segments[n_final:]
+            if tail:
+                text = " ".join(seg.text for seg in tail).strip()
+                if text:
+                    out.append(StreamSegment(text, offset + tail[0].start, offset + tail[-1].end, False))
+            commit = None
+            if n_final and not last:
+                commit = job_start + int(segments[n_final - 1].end * sr)
+            elif not segments and not last and job_len >= max_window:
+                # A full window with nothing in it (silence): keep only the overlap, or the window and the cost
+                # of every step would keep growing for as long as nobody speaks
+                commit = job_start + job_len - int(self.config.stream_overlap * sr)
+            if commit is not None:
+                drop = min(max(commit - window_start, 0), window_len)
+                if drop:
+                    audio = collapse()[drop:]
+                    blocks[:] = [audio] if len(audio) else []
+                    window_len -= drop
+                    window_start += drop
+            return out
+
+        print(f"Streaming transcription{' for ' + str(duration) + ' seconds' if duration else ''}...")
+        with ThreadPoolExecutor(max_workers=1) as worker, self._open_input(source) as stream:
+            try:
+                while total_frames is None or recorded < total_frames:
+                    data, _ = stream.read(block)
+                    if len(data) == 0:
+                        break
+                    chunk = to_mono(data)
+                    blocks.append(chunk)
+                    window_len += len(chunk)
+                    recorded += len(chunk)
+                    if pending and pending[0].done():
+                        future, job_start, job_len = pending
+                        pending = None
+                        for seg in settle(future.result(), job_start, job_len, last=False):
+                            yield seg
+                    if pending is None and window_len and recorded - submitted_at >= step:
+                        submitted_at = recorded
+                        audio = collapse()
+                        pending = (worker.submit(self._transcribe_window, audio), window_start, window_len)
+            except KeyboardInterrupt:
+                print("Recording stopped by user.")
+            if pending:
+                future, job_start, job_len = pending
+                for seg in settle(future.result(), job_start, job_len, last=False):
+                    if seg.final:
+                        yield seg
+            if window_len:
+                audio = collapse()
+                for seg in settle(worker.submit(self._transcribe_window, audio).result(), window_start, window_len, last=True):
+                    yield seg
+
+def vad_report(stt: STT, paths: List[str]):
+    """Transcribe each file with and without VAD gating and print how much audio and time the gate saved."""
+    sr = stt.config.sample_rate
+    total = kept = 0
+    full_time = gated_time = 0.0
+    for path in paths:
+        audio = load_audio(path, sr)
+        start = time.perf_counter()
+        stt.transcribe(audio)
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        speech, stats = stt.trim_silence(audio)
+        if len(speech):
+            stt.transcribe(speech)
+        gated = time.perf_counter() - start
+        total += stats.total_samples
+        kept += stats.kept_samples
+        full_time += full
+        gated_time += gated
+        print(f"{os.path.basename(path)}: {stats.total_samples / sr:.1f}s audio, dropped {stats.dropped_ratio:.0%}, "
+              f"{full * 1000:.0f} ms -> {gated * 1000:.0f} ms")
+    summary = VADStats(total_samples=total, kept_samples=kept)
+    print(f"Total: dropped {summary.dropped_ratio:.0%} of {total / sr:.1f}s, "
+          f"transcription {full_time:.2f}s -> {gated_time:.2f}s")
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record from the microphone and transcribe with faster-whisper")
+    sub = parser.add_subparsers(dest='command')
+    report = sub.add_parser('vad-report', help='Measure how much silence trimming saves on a set of audio files')
+    report.add_argument('paths', nargs='+', help='Audio files to measure')
+    report.add_argument('--vad', choices=['energy', 'silero'], default='energy', help='Detector to use (default: energy)')
+    batch = sub.add_parser('batch', help='Transcribe a directory or glob of audio files')
+    batch.add_argument('pattern', help='Directory (searched recursively) or glob of audio files')
+    batch.add_argument('--out', default='transcripts.jsonl', help='JSONL results file; existing entries are skipped (default: transcripts.jsonl)')
+    batch.add_argument('--srt', dest='srt_dir', help='Also write one .srt per file into this folder')
+    batch.add_argument('--model', default=STTConfig.model_name, help='Whisper model name (default: %(default)s)')
+    batch.add_argument('--device', default=STTConfig.device, help='auto, cuda or cpu (default: %(default)s)')
+    batch.add_argument('--compute-type', default=STTConfig.compute_type, help='e.g. int8 on CPU (default: %(default)s)')
+    batch.add_argument('--cpu-threads', type=int, default=STTConfig.cpu_threads, help='CPU threads, 0 for the default (default: %(default)s)')
+    batch.add_argument('--beam-size', type=int, default=STTConfig.beam_size, help='Beam width; 1 is greedy and fastest (default: %(default)s)')
+    batch.add_argument('--batch-size', type=int, default=STTConfig.batch_size, help='Clips per forward pass (default: %(default)s)')
+    batch.add_argument('--workers', type=int, default=4, help='Decoder threads (default: %(default)s)')
+    batch.add_argument('--language', help='Skip language detection, e.g. en')
+    args = parser.parse_args(argv)
+
+    if args.command == 'batch':
+        from .batch import find_audio, transcribe_batch
+        paths = find_audio(args.pattern)
+        if not paths:
+            print(f"No audio files found for {args.pattern}")
+            return
+        config = STTConfig(model_name=args.model, device=args.device, compute_type=args.compute_type,
+                           cpu_threads=args.cpu_threads, beam_size=args.beam_size, batch_size=args.batch_size)
+        transcribe_batch(STT(config), paths, args.out, srt_dir=args.srt_dir, workers=args.workers, language=args.language)
+        return
+
+    if args.command == 'vad-report':
+        vad_report(STT(STTConfig(vad=args.vad)), args.paths)
+        return
 
-if __name__ == '__main__':
     stt = STT()
     print("Speak into the microphone. Press Ctrl+C to stop recording.")
     text = stt.record_and_transcribe()
-    print(f"You said: {text}") 
\ No newline at end of file
+    print(f"You said: {text}")
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,62 @@
 from dataclasses import dataclass, field
-from typing import Optional, List
-import torchaudio as ta
-from chatterbox.tts import ChatterboxTTS
+from typing import Optional, List, Iterator, TYPE_CHECKING
+from collections import OrderedDict
 import os
-import sounddevice as sd
+import re
+import argparse
+import soundfile as sf
 import numpy as np
+from .audio import StreamPlayer, file_digest
+from .audio_cache import AudioCache
+from .device import torch_device
+
+if TYPE_CHECKING:
+    from chatterbox.tts import ChatterboxTTS, Conditionals
 
 @dataclass
 class TTSConfig:
-    device: str = 'cuda'
+    device: str = 'auto'  # 'auto' picks cuda, then mps, then cpu
+    torch_threads: Optional[int] = None  # Cap torch intra-op threads when running on CPU
+    quantize: bool = False  # Dynamic int8 quantization of the T3 Linear layers on CPU
     default_voice_sample: Optional[str] = None  # Path to default sample
     output_path: str = 'chatterbox_out.wav'
     sample_dir: str = 'audio/'  # Directory with voice samples
+    max_chunk_chars: int = 250  # Streaming splits sentences longer than this at clause boundaries
+    voice_cache_size: int = 8  # Speaker conditionals kept in memory
+    persist_voice_cache: bool = False  # Save conditionals as <sample>.conds.pt next to each WAV
+    warm_default_voice: bool = False  # Prepare default_voice_sample's conditionals at startup
+    cache_dir: Optional[str] = 'HID/tts/cache'  # Rendered phrase cache; None disables it
+    cache_max_mb: int = 256
+    cache_memory_items: int = 64  # Clips also kept decoded in memory
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+_CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+def split_sentences(text: str, max_chars: int = 250) -> List[str]:
+    """Split text into sentences, breaking any longer than max_chars at commas, semicolons or colons."""
+    chunks = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ''
+        for clause in _CLAUSE_END.split(sentence):
+            if current and len(current) + 1 + len(clause) > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return chunks
+
+def to_numpy(wav) -> np.ndarray:
+    """Flatten a generated (1, samples) tensor into a float32 array for playback."""
+    arr = wav.detach().cpu().numpy() if hasattr(wav, 'cpu') else np.asarray(wav)
+    return arr.reshape(-1).astype(np.float32, copy=False)
 
 class Voices:
     """Dynamically exposes voice samples as attributes (e.g., TINA, MALE1)."""
@@ -30,34 +75,196 @@ class Voices:
     def __iter__(self):
         return iter(self._samples.values())
 
+class ConditioningCache:
+    """
+    LRU of Chatterbox speaker conditionals keyed by voice sample path. An entry is rebuilt when the sample's
+    mtime changes. With persist=True the conditionals are also stored next to the WAV, so a restart loads
+    them instead of re-embedding the reference audio.
+    """
+    def __init__(self, model: "ChatterboxTTS", capacity: int = 8, persist: bool = False):
+        self.model = model
+        self.capacity = capacity
+        self.persist = persist
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # path -> (mtime, conditionals)
+
+    @staticmethod
+    def persist_path(sample: str) -> str:
+        return os.path.splitext(sample)[0] + '.conds.pt'
+
+    def get(self, sample: str) -> "Conditionals":
+        path = os.path.abspath(sample)
+        mtime = os.path.getmtime(path)
+        entry = self._entries.get(path)
+        if entry and entry[0] == mtime:
+            self._entries.move_to_end(path)
+            return entry[1]
+        conds = self._load(path, mtime)
+        self._entries[path] = (mtime, conds)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return conds
+
+    def _load(self, path: str, mtime: float) -> "Conditionals":
+        saved = self.persist_path(path)
+        if self.persist and os.path.isfile(saved) and os.path.getmtime(saved) >= mtime:
+            from chatterbox.tts import Conditionals
+            return Conditionals.load(saved, map_location='cpu').to(self.model.device)
+        self.model.prepare_conditionals(path)
+        conds = self.model.conds
+        if self.persist:
+            conds.save(saved)
+        return conds
+
+    def __contains__(self, sample: str) -> bool:
+        return os.path.abspath(sample) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 class TTS:
     def __init__(self, config: TTSConfig = TTSConfig()):
+        from chatterbox.tts import ChatterboxTTS  # Pulls in torch; deferred so importing this module stays cheap
         self.config = config
-        self.model = ChatterboxTTS.from_pretrained(device=config.device)
+        self.device = torch_device(config.device)
+        if self.device == 'cpu':
+            self._tune_cpu()
+        self.model = ChatterboxTTS.from_pretrained(device=self.device)
+        if self.device == 'cpu' and config.quantize:
+            self._quantize()
         self.voices = Voices(config.sample_dir)
+        self.voice_cache = ConditioningCache(self.model, config.voice_cache_size, config.persist_voice_cache)
+        self._builtin_conds = self.model.conds  # Chatterbox's own default voice, used when no sample is given
+        self.audio_cache = AudioCache(config.cache_dir, config.cache_max_mb * 1024 * 1024, config.cache_memory_items) if config.cache_dir else None
+        self._voice_digests = {}  # (path, mtime) -> content hash, so samples are hashed once
+        if config.warm_default_voice and config.default_voice_sample:
+            self.voice_cache.get(self._voice_path(None))
+
+    def _tune_cpu(self):
+        import torch
+        if self.config.torch_threads:
+            torch.set_num_threads(self.config.torch_threads)
+
+    def _quantize(self):
+        """Swap the token model's Linear layers for int8 dynamic-quantized ones. Most CPU time is spent there."""
+        import torch
+        self.model.t3 = torch.quantization.quantize_dynamic(self.model.t3, {torch.nn.Linear}, dtype=torch.qint8)
 
     def list_voice_samples(self):
         return self.voices.list()
 
-    def synthesize(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None, play: bool = True, save: bool = False):
-        """Generate speech from text using a selected voice sample (by name or file). Optionally play and/or save the audio."""
+    def _voice_path(self, voice: Optional[str]) -> Optional[str]:
         sample = voice or self.config.default_voice_sample
         if sample and not os.path.isabs(sample):
             sample = os.path.join(self.config.sample_dir, sample)
-        wav = self.model.generate(text, audio_prompt_path=sample)
+        return sample
+
+    def _use_voice(self, sample: Optional[str]):
+        """Point the model at a voice's cached conditionals, so generate() needs no audio_prompt_path."""
+        self.model.conds = self.voice_cache.get(sample) if sample else self._builtin_conds
+
+    def precompute_voices(self):
+        """Prepare conditionals for every sample in sample_dir (up to voice_cache_size of them stay in memory)."""
+        for name in self.voices:
+            self.voice_cache.get(self._voice_path(name))
+
+    def _voice_digest(self, sample: Optional[str]) -> str:
+        if not sample:
+            return 'builtin'
+        key = (os.path.abspath(sample), os.path.getmtime(sample))
+        if key not in self._voice_digests:
+            self._voice_digests[key] = file_digest(sample)
+        return self._voice_digests[key]
+
+    def _render(self, text: str, sample: Optional[str], params: dict) -> np.ndarray:
+        """Generate one utterance, or return it from the audio cache if this text, voice and params were rendered before."""
+        key = None
+        if self.audio_cache is not None:
+            key = AudioCache.make_key(text, self._voice_digest(sample), params)
+            hit = self.audio_cache.get(key)
+            if hit is not None:
+                return hit[0]
+        self._use_voice(sample)
+        audio = to_numpy(self.model.generate(text, **params))
+        if key:
+            self.audio_cache.put(key, audio, self.model.sr)
+        return audio
+
+    def synthesize_iter(self, text: str, voice: Optional[str] = None, **params) -> Iterator[np.ndarray]:
+        """Generate speech one sentence at a time, yielding each as a float32 array at model.sr."""
+        sample = self._voice_path(voice)
+        for chunk in split_sentences(text, self.config.max_chunk_chars):
+            yield self._render(chunk, sample, params)
+
+    def synthesize(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None, play: bool = True, save: bool = False, stream: bool = False, **params):
+        """
+        Generate speech from text using a selected voice sample (by name or file). Optionally play and/or save the audio.
+        With stream=True each sentence starts playing as soon as it is generated while the next one is generated.
+        Extra keyword arguments (exaggeration, cfg_weight, temperature) are passed to ChatterboxTTS.generate.
+        """
+        if stream:
+            return self._synthesize_stream(text, voice, output_path, play, save, params)
+        audio = self._render(text, self._voice_path(voice), params)
         sr = self.model.sr
         if play:
-            # Convert torch tensor to numpy if needed
-            arr = wav.cpu().numpy() if hasattr(wav, 'cpu') else np.array(wav)
-            sd.play(arr, sr)
+            import sounddevice as sd  # Only playback needs PortAudio
+            sd.play(audio, sr)
             sd.wait()
         out_path = output_path or self.config.output_path
         if save:
-            ta.save(out_path, wav, sr)
+            sf.write(out_path, audio, sr)
             return out_path
         return None
 
-if __name__ == '__main__':
+    def _synthesize_stream(self, text: str, voice: Optional[str], output_path: Optional[str], play: bool, save: bool, params: dict):
+        chunks = []
+        if play:
+            # The output callback plays chunk N on the audio thread while this thread generates chunk N+1
+            with StreamPlayer(self.model.sr) as player:
+                for chunk in self.synthesize_iter(text, voice=voice, **params):
+                    player.put(chunk)
+                    chunks.append(chunk)
+        elif save:
+            chunks = list(self.synthesize_iter(text, voice=voice, **params))
+        out_path = output_path or self.config.output_path
+        if save and chunks:
+            sf.write(out_path, np.concatenate(chunks), self.model.sr)
+            return out_path
+        return None
+
+    def prerender(self, phrases: List[str], voice: Optional[str] = None, **params) -> int:
+        """Render phrases into the audio cache ahead of time. Returns how many were newly generated."""
+        if self.audio_cache is None:
+            raise ValueError("TTSConfig.cache_dir is not set")
+        sample = self._voice_path(voice)
+        rendered = 0
+        for phrase in phrases:
+            key = AudioCache.make_key(phrase, self._voice_digest(sample), params)
+            if key in self.audio_cache:
+                continue
+            self._render(phrase, sample, params)
+            rendered += 1
+        self.audio_cache.flush()
+        return rendered
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Text-to-speech with Chatterbox")
+    sub = parser.add_subparsers(dest='command')
+    pre = sub.add_parser('prerender', help='Render a list of phrases (one per line) into the audio cache')
+    pre.add_argument('phrases', help='Text file with one phrase per line')
+    pre.add_argument('--voice', help='Voice sample name or path (default: TTSConfig.default_voice_sample)')
+    pre.add_argument('--cache-dir', default=TTSConfig.cache_dir, help='Cache folder (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'prerender':
+        with open(args.phrases, encoding='utf-8') as f:
+            phrases = [line.strip() for line in f if line.strip()]
+        tts = TTS(TTSConfig(cache_dir=args.cache_dir))
+        rendered = tts.prerender(phrases, voice=args.voice)
+        cache = tts.audio_cache
+        print(f"Rendered {rendered} of {len(phrases)} phrases; cache holds {len(cache)} clips ({cache.size_bytes / 1e6:.1f} MB).")
+        return
+
     tts = TTS()
     print('Available voice samples:', tts.list_voice_samples())
     # Example: use tts.voices.TINA if 'TINA.wav' exists
@@ -67,4 +274,9 @@ if __name__ == '__main__':
         if out:
             print(f'Saved synthesized audio to {out}')
     else:
-        print('No TINA voice found.') 
\ No newline at end of file
+        print('No TINA voice found.')
+    if tts.audio_cache is not None:
+        print(f'Audio cache: {tts.audio_cache.hits} hits, {tts.audio_cache.misses} misses')
+
+if __name__ == '__main__':
+    main()
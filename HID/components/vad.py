@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
+import numpy as np
+
+Region = Tuple[int, int]  # [start, end) in samples
+
+
+@dataclass
+class VADStats:
+    total_samples: int
+    kept_samples: int
+    latency: Optional[float] = None  # Seconds from end of speech until the text was ready
+
+    @property
+    def dropped_ratio(self) -> float:
+        if not self.total_samples:
+            return 0.0
+        return 1.0 - self.kept_samples / self.total_samples
+
+
+class EnergyVAD:
+    """Frame RMS against a fixed dBFS threshold. Cheap enough to run on every captured block."""
+    def __init__(self, sample_rate: int = 16000, threshold_db: float = -45.0, frame_ms: int = 30):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.frame = max(1, int(sample_rate * frame_ms / 1000))
+        self._threshold = 10 ** (threshold_db / 20)
+
+    def is_speech(self, block: np.ndarray) -> bool:
+        if not len(block):
+            return False
+        return float(np.sqrt(np.mean(np.square(block, dtype=np.float32)))) >= self._threshold
+
+    def speech_regions(self, audio: np.ndarray) -> List[Region]:
+        n_frames = len(audio) // self.frame
+        if n_frames == 0:
+            return [(0, len(audio))] if self.is_speech(audio) else []
+        frames = audio[:n_frames * self.frame].reshape(n_frames, self.frame)
+        voiced = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1)) >= self._threshold
+        # Rising and falling edges of the voiced mask give the region boundaries
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+        regions = [(int(s) * self.frame, int(e) * self.frame) for s, e in zip(edges[::2], edges[1::2])]
+        if regions and regions[-1][1] == n_frames * self.frame:
+            regions[-1] = (regions[-1][0], len(audio))
+        return regions
+
+
+class SileroVAD:
+    """The Silero model bundled with faster-whisper. More robust to noise, but too heavy to run per block."""
+    def __init__(self, sample_rate: int = 16000, threshold: float = 0.5, min_silence_ms: int = 300):
+        from faster_whisper.vad import VadOptions
+        self.sample_rate = sample_rate
+        self.options = VadOptions(threshold=threshold, min_silence_duration_ms=min_silence_ms, speech_pad_ms=0)
+
+    def speech_regions(self, audio: np.ndarray) -> List[Region]:
+        from faster_whisper.vad import get_speech_timestamps
+        stamps = get_speech_timestamps(audio, vad_options=self.options, sampling_rate=self.sample_rate)
+        return [(ts['start'], ts['end']) for ts in stamps]
+
+
+def make_vad(kind: str, sample_rate: int = 16000, threshold_db: float = -45.0, min_silence_ms: int = 300):
+    if kind == 'energy':
+        return EnergyVAD(sample_rate, threshold_db=threshold_db)
+    if kind == 'silero':
+        return SileroVAD(sample_rate, min_silence_ms=min_silence_ms)
+    raise ValueError(f"Unknown VAD '{kind}' (expected 'energy' or 'silero')")
+
+
+def compact(audio: np.ndarray, regions: List[Region], sample_rate: int = 16000,
+            pad_ms: int = 200, min_silence_ms: int = 300) -> np.ndarray:
+    """
+    Keep only the speech regions, each padded by pad_ms. Pauses shorter than min_silence_ms are kept
+    as-is; longer ones shrink to at most two pads, so lead-in and trailing silence disappear entirely.
+    """
+    if not regions:
+        return audio[:0]
+    pad = int(sample_rate * pad_ms / 1000)
+    gap = int(sample_rate * min_silence_ms / 1000)
+    merged: List[List[int]] = []
+    for start, end in regions:
+        start, end = max(0, start - pad), min(len(audio), end + pad)
+        if merged and start - merged[-1][1] <= gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    if len(merged) == 1:
+        start, end = merged[0]
+        return audio[start:end]
+    return np.concatenate([audio[start:end] for start, end in merged])
+
+
+def trim_silence(audio: np.ndarray, vad, pad_ms: int = 200, min_silence_ms: int = 300) -> Tuple[np.ndarray, VADStats]:
+    """Run `vad` over the audio and compact it. Returns the audio to transcribe and what was dropped."""
+    kept = compact(audio, vad.speech_regions(audio), vad.sample_rate, pad_ms=pad_ms, min_silence_ms=min_silence_ms)
+    return kept, VADStats(total_samples=len(audio), kept_samples=len(kept))
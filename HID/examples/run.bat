@@ -1 +1 @@
-python C:\Projects\tools\transcribe\whisperdesktop.py
\ No newline at end of file
+cd /d C:\Projects\tools && python -m HID.examples.whisperdesktop
\ No newline at end of file
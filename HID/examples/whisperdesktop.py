@@ -1,73 +1,35 @@
-import sounddevice as sd
 import soundfile as sf
-import numpy as np
 import keyboard
 import pyperclip
 from faster_whisper import WhisperModel, BatchedInferencePipeline
-import time
+from concurrent.futures import ThreadPoolExecutor
+from HID.components.ptt import PushToTalk
+from HID.components.vad import EnergyVAD, trim_silence
+from HID.components.device import whisper_device, whisper_compute_type
 
-PTT_KEY = 'f23'
-RECORD_KEY = 'ctrl+f23'
+PTT_KEY = 'f23'  # Hold to talk; with Ctrl held, press once to start recording and again to stop
 RECORD_FILENAME = 'tmp/recording.wav'
 SAMPLE_RATE = 16000
-CHANNELS = 1
+MAX_RECORD_SECONDS = 300
+PREROLL_MS = 300  # Audio from just before the key press that is kept, so the first syllable is not clipped
+SAVE_RECORDINGS = False  # Also write each recording to RECORD_FILENAME in the background
+TRIM_SILENCE = True  # Drop lead-in, trailing and long pauses of silence before transcribing
 
 
-model = WhisperModel("base", device="cuda")
+DEVICE = whisper_device()  # cuda if available, otherwise cpu with int8
+model = WhisperModel("base", device=DEVICE, compute_type=whisper_compute_type("auto", DEVICE))
 model = BatchedInferencePipeline(model=model)
+vad = EnergyVAD(SAMPLE_RATE)
+writer = ThreadPoolExecutor(max_workers=1)
 
 
-def wait_for_key_and_record(key, filename):
-    print(f"Hold {key.upper()} to record. Release to stop and transcribe.")
-    keyboard.wait(key)
-    print("Recording...")
-    frames = []
-    with sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS) as stream:
-        while keyboard.is_pressed(key):
-            data, _ = stream.read(1024)
-            frames.append(data)
-    print("Recording stopped.")
-    if frames:
-        audio = np.concatenate(frames, axis=0)
-        sf.write(filename, audio, SAMPLE_RATE)
-    else:
-        print("No audio recorded.")
-
-
-def toggle_record_and_save(key, filename):
-    print(f"Press {key.upper()} to start recording. Press again to stop and transcribe.")
-    recording = False
-    frames = []
-    while True:
-        keyboard.wait(key)
-        # Debounce: wait for key release
-        while keyboard.is_pressed(key):
-            sd.sleep(50)
-        if not recording:
-            print("Recording...")
-            frames = []
-            recording = True
-            with sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS) as stream:
-                while recording:
-                    if keyboard.is_pressed(key):
-                        # Debounce: wait for key release
-                        while keyboard.is_pressed(key):
-                            sd.sleep(50)
-                        print("Recording stopped.")
-                        recording = False
-                        break
-                    data, _ = stream.read(1024)
-                    frames.append(data)
-            break  # Exit after one record-toggle cycle
-    if frames:
-        audio = np.concatenate(frames, axis=0)
-        sf.write(filename, audio, SAMPLE_RATE)
-    else:
-        print("No audio recorded.")
-
-
-def transcribe_and_copy(filename):
-    segments, info = model.transcribe(filename)
+def transcribe_and_copy(audio):
+    if TRIM_SILENCE:
+        audio, stats = trim_silence(audio, vad)
+        if not len(audio):
+            print("No speech detected.")
+            return
+    segments, info = model.transcribe(audio)
     text = " ".join([segment.text for segment in segments]).strip() + " "
     print(text)
     pyperclip.copy(text)
@@ -75,33 +37,19 @@ def transcribe_and_copy(filename):
     keyboard.press_and_release("ctrl+v")
 
 
-def handle_ptt():
-    wait_for_key_and_record(PTT_KEY, RECORD_FILENAME)
-    transcribe_and_copy(RECORD_FILENAME)
-
-
-def handle_record():
-    toggle_record_and_save(RECORD_KEY, RECORD_FILENAME)
-    transcribe_and_copy(RECORD_FILENAME)
+def handle_recording(audio):
+    if SAVE_RECORDINGS:
+        writer.submit(sf.write, RECORD_FILENAME, audio, SAMPLE_RATE)
+    transcribe_and_copy(audio)
 
 
 def main():
     print(f"Press and hold {PTT_KEY.upper()} for Push-To-Talk, or CTRL+{PTT_KEY.upper()} to toggle Record mode.")
-    last_ptt = False
-    last_record = False
-    while True:
-        ptt_now = keyboard.is_pressed(PTT_KEY) and not keyboard.is_pressed('ctrl')
-        record_now = keyboard.is_pressed(PTT_KEY) and keyboard.is_pressed('ctrl')
-        # PTT: F23 pressed (without Ctrl)
-        if ptt_now and not last_ptt:
-            handle_ptt()
-        # RECORD: Ctrl+F23 pressed
-        if record_now and not last_record:
-            handle_record()
-        last_ptt = ptt_now
-        last_record = record_now
-        time.sleep(0.05)
+    engine = PushToTalk(handle_recording, sample_rate=SAMPLE_RATE, preroll_ms=PREROLL_MS, max_record_seconds=MAX_RECORD_SECONDS)
+    engine.bind(PTT_KEY, toggle_modifier='ctrl')
+    with engine.start():
+        keyboard.wait()  # Key events drive the engine; nothing polls while idle
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
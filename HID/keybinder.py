@@ -1,30 +1,192 @@
-import keyboard
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional
+from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import threading
+import time
+
+# What to do when a hotkey is pressed while its handler is still running
+DROP = 'drop'  # Ignore the new press
+QUEUE = 'queue'  # Run it after the current one, up to max_queue pending presses
+CANCEL_PREVIOUS = 'cancel'  # Signal the running handler to stop, discard queued presses, run the new one next.
+# Cancellation is cooperative: a handler that hasn't started yet is skipped, but one that is already running
+# only stops early if it checks cancelled() at points where it can stop (e.g. between sentences).
+POLICIES = (DROP, QUEUE, CANCEL_PREVIOUS)
+
+_local = threading.local()
+
+
+def cancelled() -> bool:
+    """
+    True inside a handler whose binding has been re-pressed under the cancel-previous policy. Long handlers
+    should poll it between steps and return early; nothing interrupts them otherwise.
+    """
+    token = getattr(_local, 'token', None)
+    return token is not None and token.is_set()
+
+
+@dataclass
+class BindingStats:
+    presses: int = 0
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    cancelled: int = 0
+    queue_depth: int = 0  # Presses waiting behind the running handler
+    max_queue_depth: int = 0
+    total_latency: float = 0.0  # Seconds from key press to handler start, summed
+    max_latency: float = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.started if self.started else 0.0
+
+
+class Binding:
+    def __init__(self, key: str, func: Callable, policy: str, max_queue: int, group_lock: Optional[threading.Lock] = None):
+        self.key = key
+        self.func = func
+        self.policy = policy
+        self.max_queue = max_queue
+        self.stats = BindingStats()
+        self.pending = deque()  # Press timestamps waiting to run
+        self.running = False
+        self.token: Optional[threading.Event] = None
+        self.lock = threading.Lock()
+        self.group_lock = group_lock  # Shared by bindings whose handlers must not overlap (same model, same speaker)
+
 
 class KeyBinder:
-    def __init__(self, exit_key: str = 'shift+esc'):
-        self.bindings: Dict[str, Callable] = {}
+    """
+    Maps hotkeys to handlers. The keyboard hook only records the press and hands it to a bounded thread
+    pool, so a slow handler never holds up the hook or other hotkeys. Each binding runs one handler at a
+    time; what happens to presses that arrive meanwhile is set per binding by its policy. Bindings registered
+    with the same group also never run at the same time as each other.
+    With listen=False nothing is hooked and presses come from trigger(), which makes it testable headless.
+    """
+    def __init__(self, exit_key: str = 'shift+esc', max_workers: int = 4, listen: bool = True):
+        self.bindings: Dict[str, Binding] = {}
         self.running = False
         self.exit_key = exit_key
-        
-    def register(self, key: str, func: Callable, suppress: bool = False):
-        """Bind a function to a key or hotkey string."""
-        self.bindings[key] = func
-        keyboard.add_hotkey(key, func, suppress=suppress)
+        self.listen = listen
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='keybinder')
+        self._groups: Dict[str, threading.Lock] = {}
+        self._stop = threading.Event()
+
+    def register(self, key: str, func: Callable, suppress: bool = False, policy: str = QUEUE, max_queue: int = 1,
+                 group: Optional[str] = None):
+        """
+        Bind a function to a key or hotkey string. Handlers that share a component which isn't safe to call
+        concurrently (e.g. one TTS model) should be given the same `group`; they then run one at a time.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        group_lock = self._groups.setdefault(group, threading.Lock()) if group else None
+        binding = Binding(key, func, policy, max_queue, group_lock)
+        self.bindings[key] = binding
+        if self.listen:
+            import keyboard  # Deferred so listen=False works without the keyboard package (headless tests)
+            keyboard.add_hotkey(key, self._on_press, args=(binding,), suppress=suppress)
 
     def unregister(self, key: str):
         if key in self.bindings:
-            keyboard.remove_hotkey(key)
+            if self.listen:
+                import keyboard
+                keyboard.remove_hotkey(key)
             del self.bindings[key]
 
+    def trigger(self, key: str):
+        """Inject a press of a registered hotkey, exactly as the keyboard hook would deliver it."""
+        self._on_press(self.bindings[key])
+
+    def stats(self) -> Dict[str, BindingStats]:
+        return {key: binding.stats for key, binding in self.bindings.items()}
+
+    def _on_press(self, binding: Binding):
+        # Runs on the keyboard hook thread: bookkeeping only, never the handler itself
+        now = time.perf_counter()
+        with binding.lock:
+            stats = binding.stats
+            stats.presses += 1
+            if not binding.running:
+                binding.running = True
+                self.executor.submit(self._run, binding, now)
+                return
+            if binding.policy == DROP:
+                stats.dropped += 1
+                return
+            if binding.policy == CANCEL_PREVIOUS:
+                binding.token.set()
+                stats.cancelled += 1
+                stats.dropped += len(binding.pending)
+                binding.pending.clear()
+            elif len(binding.pending) >= binding.max_queue:
+                stats.dropped += 1
+                return
+            binding.pending.append(now)
+            stats.queue_depth = len(binding.pending)
+            stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+
+    def _run(self, binding: Binding, pressed: float):
+        """Run the handler for one press, then any presses queued behind it, on a pool thread."""
+        while True:
+            with binding.lock:
+                binding.token = threading.Event()  # Before waiting on the group, so a re-press can cancel the wait
+            with binding.group_lock or nullcontext():  # Waiting on another handler of the group counts as latency
+                if binding.token.is_set():
+                    # Re-pressed under cancel-previous while waiting for the group (already counted as
+                    # cancelled in _on_press): skip it, the new press is queued behind
+                    ok = None
+                else:
+                    ok = self._call(binding, pressed)
+            with binding.lock:
+                stats = binding.stats
+                if ok is True:
+                    stats.completed += 1
+                elif ok is False:
+                    stats.failed += 1
+                if not binding.pending:
+                    binding.running = False
+                    return
+                pressed = binding.pending.popleft()
+                stats.queue_depth = len(binding.pending)
+
+    def _call(self, binding: Binding, pressed: float) -> bool:
+        """Run the handler for one press. Returns whether it completed without raising."""
+        with binding.lock:
+            latency = time.perf_counter() - pressed
+            stats = binding.stats
+            stats.started += 1
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+        _local.token = binding.token
+        try:
+            binding.func()
+            return True
+        except Exception as e:
+            print(f"[ERROR] Handler for '{binding.key}' failed: {e}")
+            return False
+        finally:
+            _local.token = None
+
     def run(self):
         self.running = True
-        print(f"KeyBinder is running. Press {self.exit_key} to exit.")
-        keyboard.wait(self.exit_key)
+        if self.listen:
+            import keyboard
+            print(f"KeyBinder is running. Press {self.exit_key} to exit.")
+            keyboard.wait(self.exit_key)
+        else:
+            self._stop.wait()
         self.running = False
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self):
+        """End run() when not listening to the keyboard."""
+        self._stop.set()
 
 if __name__ == '__main__':
     binder = KeyBinder()
     binder.register('f23', lambda: print('F23 pressed!'))
-    binder.run() 
\ No newline at end of file
+    binder.run()
@@ -0,0 +1,123 @@
+import threading
+import time
+from HID.keybinder import CANCEL_PREVIOUS, DROP, QUEUE, KeyBinder, cancelled
+
+
+def wait_idle(binder: KeyBinder, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while any(b.running for b in binder.bindings.values()):
+        assert time.monotonic() < deadline, "handlers still running"
+        time.sleep(0.005)
+
+
+def blocking_handler():
+    """A handler that signals when it starts and then waits to be released (or cancelled)."""
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def handler():
+        calls.append(time.monotonic())
+        started.set()
+        while not release.is_set() and not cancelled():
+            time.sleep(0.002)
+    return handler, started, release, calls
+
+
+def test_drop_ignores_presses_while_running():
+    binder = KeyBinder(listen=False)
+    handler, started, release, calls = blocking_handler()
+    binder.register('f1', handler, policy=DROP)
+    binder.trigger('f1')
+    assert started.wait(5)
+    binder.trigger('f1')
+    binder.trigger('f1')
+    release.set()
+    wait_idle(binder)
+    stats = binder.stats()['f1']
+    assert (stats.presses, stats.started, stats.completed, stats.dropped) == (3, 1, 1, 2)
+    assert len(calls) == 1
+
+
+def test_queue_runs_up_to_max_queue_presses_afterwards():
+    binder = KeyBinder(listen=False)
+    handler, started, release, calls = blocking_handler()
+    binder.register('f8', handler, policy=QUEUE, max_queue=1)
+    binder.trigger('f8')
+    assert started.wait(5)
+    binder.trigger('f8')
+    binder.trigger('f8')
+    stats = binder.stats()['f8']
+    assert (stats.queue_depth, stats.dropped) == (1, 1)
+    release.set()
+    wait_idle(binder)
+    assert (stats.presses, stats.started, stats.completed, stats.dropped, stats.queue_depth) == (3, 2, 2, 1, 0)
+    assert stats.max_queue_depth == 1
+
+
+def test_cancel_previous_stops_running_handler_and_runs_new_press():
+    binder = KeyBinder(listen=False)
+    handler, started, release, calls = blocking_handler()
+    binder.register('f9', handler, policy=CANCEL_PREVIOUS)
+    binder.trigger('f9')
+    assert started.wait(5)
+    binder.trigger('f9')  # The running handler sees cancelled() and returns; the new press runs next
+    deadline = time.monotonic() + 5
+    while len(calls) < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.002)
+    release.set()
+    wait_idle(binder)
+    stats = binder.stats()['f9']
+    assert (stats.presses, stats.started, stats.completed, stats.cancelled) == (2, 2, 2, 1)
+
+
+def test_cancel_while_waiting_on_group_skips_the_handler():
+    binder = KeyBinder(listen=False)
+    holder, held, release, _ = blocking_handler()
+    runs = []
+    binder.register('f8', holder, group='tts')
+    binder.register('ctrl+f8', lambda: runs.append(cancelled()), policy=CANCEL_PREVIOUS, group='tts')
+    binder.trigger('f8')
+    assert held.wait(5)
+    binder.trigger('ctrl+f8')  # Waits for the group lock
+    time.sleep(0.05)
+    binder.trigger('ctrl+f8')  # Cancels the waiting press; only this one should run
+    release.set()
+    wait_idle(binder)
+    stats = binder.stats()['ctrl+f8']
+    assert runs == [False]
+    assert (stats.presses, stats.started, stats.completed, stats.failed, stats.cancelled) == (2, 1, 1, 0, 1)
+
+
+def test_group_members_never_overlap():
+    binder = KeyBinder(listen=False)
+    active, overlap = [0], [0]
+    lock = threading.Lock()
+
+    def handler():
+        with lock:
+            active[0] += 1
+            overlap[0] = max(overlap[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+    binder.register('f8', handler, group='tts')
+    binder.register('ctrl+f8', handler, group='tts')
+    for _ in range(3):
+        binder.trigger('f8')
+        binder.trigger('ctrl+f8')
+    wait_idle(binder)
+    assert overlap[0] == 1
+    assert sum(s.completed for s in binder.stats().values()) == 4  # One running + one queued per binding
+
+
+def test_failed_handler_is_counted():
+    binder = KeyBinder(listen=False)
+
+    def boom():
+        raise RuntimeError('boom')
+    binder.register('f2', boom)
+    binder.trigger('f2')
+    wait_idle(binder)
+    stats = binder.stats()['f2']
+    assert (stats.started, stats.completed, stats.failed) == (1, 0, 1)
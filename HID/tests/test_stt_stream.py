@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+import numpy as np
+import soundfile as sf
+from HID.components.audio import WavInputStream
+from HID.components.stt import STT, STTConfig
+
+SR = 16000
+
+
+class EnergyPipeline:
+    """Stands in for Whisper: one segment per loud stretch of the window, nothing for silence."""
+    def __init__(self):
+        self.window_lengths = []
+
+    def transcribe(self, audio, **options):
+        self.window_lengths.append(len(audio))
+        hop = SR // 10
+        loud = [np.abs(audio[i:i + hop]).max() > 0.05 for i in range(0, len(audio), hop)]
+        segments, start = [], None
+        for i, on in enumerate(loud + [False]):
+            if on and start is None:
+                start = i
+            elif not on and start is not None:
+                segments.append(SimpleNamespace(text=f"speech@{len(segments)}", start=start * hop / SR, end=i * hop / SR))
+                start = None
+        return iter(segments), SimpleNamespace(language='en')
+
+
+class PacedWav(WavInputStream):
+    """Reads the WAV without realtime sleeps but yields the thread, so the worker keeps up as it would live."""
+    def read(self, frames):
+        import time
+        time.sleep(0.0005)
+        return super().read(frames)
+
+
+def write_fixture(path, parts):
+    """parts: [(seconds, loud)]. Loud stretches are a 220 Hz tone, the rest near-silence."""
+    chunks = []
+    for seconds, loud in parts:
+        t = np.arange(int(seconds * SR)) / SR
+        chunks.append(0.3 * np.sin(2 * np.pi * 220 * t) if loud else np.full_like(t, 1e-4))
+    sf.write(path, np.concatenate(chunks).astype(np.float32), SR)
+
+
+def test_long_silence_keeps_the_window_bounded(tmp_path):
+    wav = str(tmp_path / 'speech_silence_speech.wav')
+    write_fixture(wav, [(4, True), (60, False), (3, True), (2, False)])
+    config = STTConfig(temp_dir=str(tmp_path / 'tmp'), block_size=4096, stream_step=1.0, stream_overlap=1.0,
+                       stream_max_window=8.0)
+    pipeline = EnergyPipeline()
+    stt = STT(config, pipeline=pipeline)
+
+    segments = list(stt.transcribe_stream(source=PacedWav(wav, SR)))
+
+    # Without trimming during silence the window would reach the whole 69 s session
+    limit = (config.stream_max_window + 2 * config.stream_step) * SR + config.block_size
+    assert max(pipeline.window_lengths) <= limit
+    final = [s for s in segments if s.final]
+    assert len(final) == 2
+    assert abs(final[0].start) < 0.2 and abs(final[0].end - 4) < 0.2
+    assert abs(final[1].start - 64) < 0.2 and abs(final[1].end - 67) < 0.2
@@ -0,0 +1,9 @@
+"""
+Offline benchmark suite for the tools in this repo.
+
+    python -m benchmarks run [--only ftp,raster] [--quick] [--out results.json]
+    python -m benchmarks compare baseline.json results.json [--threshold 10]
+
+Every suite builds its own synthetic inputs (random files, generated PNGs, a WAV fixture) and needs no
+network. Suites whose dependencies aren't installed are recorded as skipped rather than failing the run.
+"""
@@ -0,0 +1,138 @@
+import argparse
+import importlib.util
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from typing import Dict, List
+from . import results
+from .suites import SUITES, Metric, RunOptions, Skip
+
+
+def _best(runs: List[List[Metric]]) -> List[Metric]:
+    """Keeps each metric's best value across repeats, which is far less noisy than the mean on a busy machine."""
+    best: Dict[str, Metric] = {}
+    for metrics in runs:
+        for m in metrics:
+            kept = best.get(m.name)
+            if kept is None or (m.value > kept.value) == m.higher_is_better:
+                best[m.name] = m
+    return list(best.values())
+
+
+def _not_installed(e: Exception) -> bool:
+    """True for a package that isn't installed at all, as opposed to an import broken inside this repo."""
+    if not isinstance(e, ModuleNotFoundError) or not e.name:
+        return False
+    return importlib.util.find_spec(e.name.split('.')[0]) is None
+
+
+def run_suites(names: List[str], options: RunOptions, repeat: int = 1):
+    """Runs each suite `repeat` times in its own scratch folder. Returns (metrics, skipped, failed)."""
+    metrics, skipped, failed = [], {}, {}
+    for name in names:
+        print(f"[INFO] {name} ...", flush=True)
+        start = time.perf_counter()
+        runs = []
+        try:
+            for _ in range(repeat):
+                work = tempfile.mkdtemp(prefix=f'bench-{name}-')
+                try:
+                    runs.append(SUITES[name](work, options))
+                finally:
+                    shutil.rmtree(work, ignore_errors=True)
+        except Exception as e:
+            if isinstance(e, Skip) or _not_installed(e):
+                print(f"[WARN] Skipping {name}: {e}")
+                skipped[name] = str(e)
+            else:
+                traceback.print_exc()
+                print(f"[ERROR] {name} failed: {type(e).__name__}: {e}")
+                failed[name] = f"{type(e).__name__}: {e}"
+            continue
+        suite_metrics = _best(runs)
+        for m in suite_metrics:
+            print(f"    {m.name:<32} {m.value:>10.3f} {m.unit}")
+        print(f"[INFO] {name} done in {time.perf_counter() - start:.1f}s")
+        metrics += suite_metrics
+    return metrics, skipped, failed
+
+
+def _fmt(value) -> str:
+    return '-' if value is None else f"{value:.3f}"
+
+
+def cmd_run(args) -> int:
+    names = args.only or list(SUITES)
+    options = RunOptions(quick=args.quick, wav=args.wav, stt_model=args.stt_model)
+    metrics, skipped, failed = run_suites(names, options, args.repeat)
+    data = results.build(metrics, skipped, failed, args.quick)
+    results.save(data, args.out)
+    print(f"[INFO] {len(metrics)} metric(s), {len(skipped)} suite(s) skipped, {len(failed)} failed -> {args.out}")
+    return 1 if failed else 0
+
+
+def cmd_compare(args) -> int:
+    baseline, current = results.load(args.baseline), results.load(args.results)
+    for key in sorted(baseline['environment']):
+        if baseline['environment'][key] != current['environment'].get(key):
+            print(f"[WARN] {key} differs: {baseline['environment'][key]} -> {current['environment'].get(key)}")
+    if baseline.get('quick') != current.get('quick'):
+        print("[WARN] Comparing a --quick run against a full one; the numbers aren't comparable")
+    rows, regressions = results.compare(baseline, current, args.threshold)
+    print(f"{'metric':<32} {'baseline':>10} {'current':>10} {'change':>8}  {'unit':<10} status")
+    for name, old, new, change, unit, status in rows:
+        change = '-' if change is None else f"{change:+.1f}%"
+        print(f"{name:<32} {_fmt(old):>10} {_fmt(new):>10} {change:>8}  {unit:<10} {status}")
+    for name in sorted(current.get('failed', {})):
+        print(f"[ERROR] Suite {name} failed in the current run: {current['failed'][name]}")
+    for name in sorted(current.get('skipped', {})):
+        print(f"[WARN] Suite {name} was skipped in the current run: {current['skipped'][name]}")
+    missing = [name for name, *_, status in rows if status == 'MISSING']
+    if missing:
+        print(f"[ERROR] {len(missing)} baseline metric(s) missing from the current run")
+    if regressions:
+        print(f"[ERROR] {len(regressions)} metric(s) regressed by more than {args.threshold:g}%")
+    if missing or regressions:
+        return 1
+    print(f"[INFO] No regressions beyond {args.threshold:g}%")
+    return 1 if current.get('failed') else 0
+
+
+def _suites(value: str) -> List[str]:
+    names = [n.strip() for n in value.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SUITES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown suite(s) {', '.join(unknown)} (choose from {', '.join(SUITES)})")
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Offline benchmarks for the tools in this repo")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run suites and write their metrics as JSON')
+    run.add_argument('--only', type=_suites, help=f"Comma-separated suites (default: all of {','.join(SUITES)})")
+    run.add_argument('--out', default='benchmark-results.json', help='Results file (default: %(default)s)')
+    run.add_argument('--repeat', type=int, default=1, help='Run each suite N times and keep the best value (default: 1)')
+    run.add_argument('--quick', action='store_true', help='Small inputs, for checking the suites still work')
+    run.add_argument('--wav', help='Speech recording for STT instead of the synthetic fixture')
+    run.add_argument('--stt-model', default='tiny', help='Whisper model for STT (default: %(default)s)')
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser('compare', help='Flag metrics that got worse than a stored baseline')
+    compare.add_argument('baseline', help='Results JSON to compare against')
+    compare.add_argument('results', help='Results JSON of the run being checked')
+    compare.add_argument('--threshold', type=float, default=10.0, help='Allowed slowdown in percent (default: 10)')
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import math
+import random
+import struct
+import wave
+
+
+def write_speech_wav(path: str, seconds: float = 10.0, samplerate: int = 16000, seed: int = 0) -> str:
+    """
+    Writes a deterministic mono 16-bit WAV that stands in for the microphone: voiced 'syllables' (a pitch
+    contour with a few harmonics and a little noise) separated by short pauses, so VAD and decoding see
+    something speech-shaped. It isn't intelligible; it only has to cost the models what speech would.
+    """
+    rng = random.Random(seed)
+    frames = bytearray()
+    total = int(seconds * samplerate)
+    phase = 0.0
+    written = 0
+    while written < total:
+        voiced = rng.uniform(0.12, 0.3)
+        pause = rng.uniform(0.05, 0.25) if rng.random() < 0.3 else 0.02
+        f0 = rng.uniform(100, 180)
+        n = min(int(voiced * samplerate), total - written)
+        for i in range(n):
+            t = i / n
+            envelope = math.sin(math.pi * t) ** 2
+            phase += 2 * math.pi * f0 * (1 + 0.1 * math.sin(2 * math.pi * t)) / samplerate
+            sample = sum(math.sin(k * phase) / k for k in (1, 2, 3, 5)) * 0.3 * envelope + rng.gauss(0, 0.01)
+            frames += struct.pack('<h', max(-32767, min(32767, int(sample * 32767))))
+        written += n
+        silence = min(int(pause * samplerate), total - written)
+        for _ in range(silence):
+            frames += struct.pack('<h', int(rng.gauss(0, 0.003) * 32767))
+        written += silence
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(samplerate)
+        f.writeframes(bytes(frames))
+    return path
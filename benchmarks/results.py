@@ -0,0 +1,73 @@
+import datetime
+import json
+import os
+import platform
+from dataclasses import asdict
+from typing import Dict, List, Tuple
+from .suites import Metric
+
+FORMAT_VERSION = 1
+
+
+def environment() -> dict:
+    """What the numbers depend on besides the code; compare warns when these differ."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def build(metrics: List[Metric], skipped: Dict[str, str], failed: Dict[str, str], quick: bool) -> dict:
+    return {
+        'version': FORMAT_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'quick': quick,
+        'environment': environment(),
+        'metrics': {m.name: {k: v for k, v in asdict(m).items() if k != 'name'} for m in metrics},
+        'skipped': skipped,
+        'failed': failed,
+    }
+
+
+def save(results: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported results version {results.get('version')!r}")
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float = 10.0) -> Tuple[List[tuple], List[str]]:
+    """
+    Returns (rows, regressions). Each row is (name, old, new, change %, unit, status) for every metric in either
+    file; a change counts as a regression when it moves the wrong way by more than `threshold` percent. A
+    baseline metric absent from `current` gets status 'MISSING': its suite was skipped or stopped reporting it.
+    """
+    rows, regressions = [], []
+    old_metrics, new_metrics = baseline['metrics'], current['metrics']
+    for name in sorted(old_metrics.keys() | new_metrics.keys()):
+        old, new = old_metrics.get(name), new_metrics.get(name)
+        if old is None or new is None:
+            status = 'new' if old is None else 'MISSING'  # A metric that stopped being produced fails compare
+            metric = new or old
+            rows.append((name, old and old['value'], new and new['value'], None, metric['unit'], status))
+            continue
+        change = (new['value'] - old['value']) / old['value'] * 100 if old['value'] else 0.0
+        worse = -change if new['higher_is_better'] else change
+        if worse > threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        elif worse < -threshold:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append((name, old['value'], new['value'], change, new['unit'], status))
+    return rows, regressions
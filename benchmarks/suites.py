@@ -0,0 +1,189 @@
+"""
+One function per suite. Each takes a scratch folder and the run options and returns a list of Metrics.
+Raise Skip (or let an ImportError through) only when a package, tool or model the suite needs isn't installed;
+any other error counts as a failure, since that is what a broken change looks like.
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import pathlib
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from .fixtures import write_speech_wav
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+class Skip(Exception):
+    """The suite can't run in this environment (missing tool, model or package)."""
+
+
+@dataclass
+class Metric:
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = True
+
+
+@dataclass
+class RunOptions:
+    quick: bool = False  # Smaller inputs: a smoke test, not numbers to compare
+    wav: Optional[str] = None  # Real speech for STT instead of the synthetic fixture
+    stt_model: str = 'tiny'
+
+
+def _on_path(folder: pathlib.Path):
+    if str(folder) not in sys.path:
+        sys.path.insert(0, str(folder))
+
+
+def ftp(work: str, options: RunOptions) -> List[Metric]:
+    """FTPUploader against a pyftpdlib server in a child process: many small files, then a few large ones."""
+    import pyftpdlib  # noqa: F401  (skip early rather than inside the server process)
+    _on_path(ROOT / 'ftp')
+    from benchmark import run
+
+    small, large_mb = (40, 8) if options.quick else (200, 64)
+    configs = [('small', n, {}) for n in (1, 4)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(configs, small, 64, 0, 0)
+        results += run([('large', 1, {})], 0, 0, 2, large_mb)
+    metrics = []
+    for label, n, elapsed, mbps, fps, cpu, failed in results:
+        if failed:
+            raise RuntimeError(f"{failed} upload(s) failed in the {label} x{n} run")
+        metrics.append(Metric(f'ftp.{label}.{n}conn.MB_s', mbps, 'MB/s'))
+        if label == 'small':
+            metrics.append(Metric(f'ftp.{label}.{n}conn.files_s', fps, 'files/s'))
+        metrics.append(Metric(f'ftp.{label}.{n}conn.cpu', cpu, '%', higher_is_better=False))
+    return metrics
+
+
+def raster(work: str, options: RunOptions) -> List[Metric]:
+    """batch_convert over generated alpha PNGs: one job, all CPUs, and a no-op rebuild from the cache."""
+    _on_path(ROOT / 'scripts' / 'raster_to_svg')
+    from raster_to_svg.__main__ import batch_convert, resolve_tracer
+    from raster_to_svg.benchmark import make_pngs
+    try:
+        tracer = resolve_tracer('auto')
+    except RuntimeError as e:
+        raise Skip(str(e))
+
+    count = 40 if options.quick else 200
+    source = pathlib.Path(work) / 'png'
+    make_pngs(source, count, 256)
+    metrics = []
+    for jobs in sorted({1, os.cpu_count() or 1}):
+        out = pathlib.Path(work) / f'svg-{jobs}'
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            converted, failed = batch_convert(source, out, jobs=jobs, tracer=tracer, force=True)
+            elapsed = time.perf_counter() - start
+            if failed:
+                raise RuntimeError(f"{len(failed)} PNG(s) failed to convert")
+            metrics.append(Metric(f'raster.{tracer}.{jobs}job.files_s', len(converted) / elapsed, 'files/s'))
+            if jobs == 1:
+                start = time.perf_counter()
+                batch_convert(source, out, jobs=jobs, tracer=tracer)
+                metrics.append(Metric('raster.cached.files_s', count / (time.perf_counter() - start), 'files/s'))
+    return metrics
+
+
+def _speech(work: str, options: RunOptions) -> str:
+    return options.wav or write_speech_wav(os.path.join(work, 'speech.wav'))
+
+
+def stt(work: str, options: RunOptions) -> List[Metric]:
+    """
+    Whisper real-time factor on the WAV fixture, loaded the same way a recording is, then the same audio cut
+    into short clips and transcribed as one packed batch (the `stt batch` / daemon path).
+    """
+    from faster_whisper.utils import download_model
+    from HID.components.audio import load_audio
+    from HID.components.batch import BatchItem, transcribe_items
+    from HID.components.benchmark import bench_stt
+    from HID.components.stt import STT, STTConfig
+
+    if not os.path.isdir(options.stt_model):
+        try:
+            download_model(options.stt_model, local_files_only=True)
+        except (OSError, ValueError) as e:
+            raise Skip(f"Whisper model '{options.stt_model}' is not in the local cache ({e})")
+    config = STTConfig(model_name=options.stt_model, device='cpu', compute_type='int8', beam_size=1,
+                       temp_dir=os.path.join(work, 'tmp'))
+    sr = config.sample_rate
+    audio = load_audio(_speech(work, options), sr)
+    if options.quick:
+        audio = audio[:5 * sr]
+    result = bench_stt(config, audio, repeats=1 if options.quick else 3)
+    if result.error:
+        raise RuntimeError(result.error)
+
+    model = STT(config)
+    clips = [audio[i:i + 2 * sr] for i in range(0, len(audio), 2 * sr)][:config.batch_size]
+    items = [BatchItem(f'clip{i}', '', clip) for i, clip in enumerate(clips)]
+    start = time.perf_counter()
+    results = transcribe_items(model, items, language='en')
+    batch_seconds = time.perf_counter() - start
+    if len(results) != len(items):
+        raise RuntimeError(f"transcribe_items returned {len(results)} results for {len(items)} clips")
+    name = os.path.basename(options.stt_model.rstrip('/\\'))
+    return [Metric(f'stt.{name}.rtf', result.rtf, 'x realtime', higher_is_better=False),
+            Metric(f'stt.{name}.load', result.load_seconds, 's', higher_is_better=False),
+            Metric(f'stt.{name}.batch_rtf', batch_seconds / (sum(len(c) for c in clips) / sr), 'x realtime',
+                   higher_is_better=False)]
+
+
+def tts(work: str, options: RunOptions) -> List[Metric]:
+    """Chatterbox real-time factor on the CPU with the phrase cache disabled."""
+    from huggingface_hub import snapshot_download
+    from chatterbox.tts import REPO_ID
+    from HID.components.benchmark import BENCH_TEXT, bench_tts
+    from HID.components.tts import TTSConfig
+
+    try:
+        snapshot_download(REPO_ID, local_files_only=True)
+    except (OSError, ValueError) as e:
+        raise Skip(f"Chatterbox weights ({REPO_ID}) are not in the local cache ({e})")
+    text = BENCH_TEXT.split(',')[0] + '.' if options.quick else BENCH_TEXT
+    result = bench_tts(TTSConfig(device='cpu'), text, repeats=1)
+    if result.error:
+        raise RuntimeError(result.error)
+    return [Metric('tts.cpu.rtf', result.rtf, 'x realtime', higher_is_better=False),
+            Metric('tts.cpu.load', result.load_seconds, 's', higher_is_better=False)]
+
+
+def pdf(work: str, options: RunOptions) -> List[Metric]:
+    """LineItemTable on a long generated statement."""
+    _on_path(ROOT / 'scripts' / 'PDF')
+    from fpdf import FPDF
+    from table import LineItemTable
+    # Loaded by path: ftp/benchmark.py already owns the top-level name 'benchmark'
+    spec = importlib.util.spec_from_file_location('pdf_benchmark', ROOT / 'scripts' / 'PDF' / 'benchmark.py')
+    pdf_benchmark = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(pdf_benchmark)
+
+    rows = 2000 if options.quick else 20000
+    start = time.perf_counter()
+    document = FPDF()
+    document.add_page()
+    document.set_font('helvetica', size=12)
+    table = LineItemTable(document)
+    table.write(pdf_benchmark.line_items(rows))
+    document.output()
+    elapsed = time.perf_counter() - start
+    return [Metric('pdf.table.pages_s', table.pages / elapsed, 'pages/s'),
+            Metric('pdf.table.rows_s', rows / elapsed, 'rows/s')]
+
+
+SUITES: Dict[str, Callable[[str, RunOptions], List[Metric]]] = {
+    'ftp': ftp,
+    'raster': raster,
+    'stt': stt,
+    'tts': tts,
+    'pdf': pdf,
+}
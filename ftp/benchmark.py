@@ -0,0 +1,121 @@
+# benchmark.py
+#
+# Measures FTPUploader throughput against a throwaway local pyftpdlib server.
+# The server runs in its own process, so the CPU% column is the uploader's cost alone.
+# Usage: python benchmark.py [--files 200] [--size-kb 64] [--connections 1,4,8]
+#        python benchmark.py --io [--large-count 2 --large-mb 256]   compare block size / progress settings
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from ftp import FTPUploader
+
+USER = 'bench'
+PASSWD = 'bench'
+
+
+def _serve(root: str, ports):
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import ThreadedFTPServer
+    import logging
+    logging.basicConfig(level=logging.WARNING)  # pyftpdlib logs every command unless logging is already set up
+
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USER, PASSWD, root, perm='elradfmwMT')
+    handler = type('BenchHandler', (FTPHandler,), {'authorizer': authorizer})
+    server = ThreadedFTPServer(('127.0.0.1', 0), handler)
+    ports.put(server.address[1])
+    server.serve_forever(handle_exit=False)
+
+
+def start_server(root: str):
+    """Starts a pyftpdlib server on a free localhost port in a child process. Returns (process, port)."""
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(root, ports), daemon=True)
+    process.start()
+    return process, ports.get(timeout=30)
+
+
+# label -> FTPUploader settings for --io
+IO_CONFIGS = {
+    '8k, every block': dict(block_size=8192, adaptive=False, socket_buffer=0, progress_hz=0),
+    '64k fixed': dict(block_size=65536, adaptive=False),
+    '1m fixed': dict(block_size=1024 * 1024, adaptive=False),
+    'adaptive': dict(),
+}
+
+
+def make_files(folder: str, count: int, size_kb: int, large_count: int = 0, large_mb: int = 0):
+    """Writes `count` random files of size_kb plus `large_count` files of large_mb. Returns their paths."""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    specs = [size_kb * 1024] * count + [large_mb * 1024 * 1024] * large_count
+    for i, size in enumerate(specs):
+        path = os.path.join(folder, f"file_{i:05d}.bin")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def clear(folder: str):
+    for name in os.listdir(folder):
+        os.remove(os.path.join(folder, name))
+
+
+def run(configs, files: int, size_kb: int, large_count: int, large_mb: int):
+    """Uploads the same file set once per (label, connections, settings) config and prints a table."""
+    work = tempfile.mkdtemp(prefix='ftp-bench-')
+    try:
+        remote = os.path.join(work, 'remote')
+        os.makedirs(remote)
+        paths = make_files(os.path.join(work, 'local'), files, size_kb, large_count, large_mb)
+        total = sum(os.path.getsize(p) for p in paths)
+        server, port = start_server(remote)
+        results = []
+        try:
+            for label, n, settings in configs:
+                clear(remote)
+                uploader = FTPUploader(host='127.0.0.1', port=port, user=USER, passwd=PASSWD, **settings)
+                start, cpu = time.perf_counter(), time.process_time()
+                uploaded, failed = uploader.upload_files_parallel(paths, connections=n)
+                elapsed = time.perf_counter() - start
+                cpu = time.process_time() - cpu
+                uploader.disconnect()
+                results.append((label, n, elapsed, total / elapsed / 1e6, len(uploaded) / elapsed,
+                                100 * cpu / elapsed, len(failed)))
+        finally:
+            server.terminate()
+        print(f"\n{len(paths)} files, {total / 1e6:.1f} MB")
+        print(f"{'config':<16} {'conns':>5} {'seconds':>8} {'MB/s':>8} {'files/s':>8} {'CPU%':>6} {'failed':>6}")
+        for label, n, elapsed, mbps, fps, cpu, nfail in results:
+            print(f"{label:<16} {n:>5} {elapsed:>8.2f} {mbps:>8.1f} {fps:>8.1f} {cpu:>6.0f} {nfail:>6}")
+        return results
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FTPUploader against a local pyftpdlib server")
+    parser.add_argument('--files', type=int, default=200, help='Number of small files (default: 200)')
+    parser.add_argument('--size-kb', type=int, default=64, help='Size of each small file (default: 64)')
+    parser.add_argument('--large-count', type=int, default=2, help='Number of large files mixed in (default: 2)')
+    parser.add_argument('--large-mb', type=int, default=16, help='Size of each large file (default: 16)')
+    parser.add_argument('--connections', default='1,4,8', help='Comma-separated connection counts (default: 1,4,8)')
+    parser.add_argument('--io', action='store_true',
+                        help='Compare block size and progress settings on the first connection count instead')
+    args = parser.parse_args()
+    connections = [int(n) for n in args.connections.split(',')]
+    if args.io:
+        configs = [(label, connections[0], settings) for label, settings in IO_CONFIGS.items()]
+    else:
+        configs = [('default', n, {}) for n in connections]
+    run(configs, args.files, args.size_kb, args.large_count, args.large_mb)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 # ftp-pyto.py
 
+import argparse
 import os
-import shutil
-from ftplib import FTP, error_perm
+import time
+from ftplib import FTP, error_perm, all_errors
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -16,73 +17,153 @@ FTP_USER = os.getenv('FTP_USER', 'anonymous')
 FTP_PASS = os.getenv('FTP_PASS', '')
 FTP_REMOTE_DIR = os.getenv('FTP_REMOTE_DIR', '')
 BUFFER_DIR = "file-buffer"
+POLL_SECONDS = 2.0       # How often watch mode looks for new files
+SETTLE_SECONDS = 2.0     # Files modified more recently than this may still be being written
+KEEPALIVE_SECONDS = 30.0 # Idle time after which watch mode sends NOOP
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def upload_stream(ftp: FTP, stream, filename: str):
+def connect() -> FTP:
+    ftp = FTP()
+    print(f"[INFO] Connecting to {FTP_HOST}:{FTP_PORT}…")
+    ftp.connect(FTP_HOST, FTP_PORT)
+    ftp.login(FTP_USER, FTP_PASS)
+    print(f"[INFO] Logged in as {FTP_USER!r}")
+    if FTP_REMOTE_DIR:
+        ftp.cwd(FTP_REMOTE_DIR)
+        print(f"[INFO] Changed to remote dir '{FTP_REMOTE_DIR}'")
+    return ftp
+
+def upload_path(ftp: FTP, path: str, filename: str) -> bool:
+    """
+    Opens and uploads one file. Returns True only when the server confirmed the STOR.
+    Connection errors are raised so the caller can reconnect; per-file refusals return False.
+    """
+    try:
+        stream = open(path, "rb")
+    except OSError as e:
+        print(f"[WARN] Couldn't open {filename!r}: {e}")
+        return False
     try:
-        ftp.storbinary(f"STOR {filename}", stream)
-        print(f"[SUCCESS] Uploaded {filename!r}")
+        with stream:
+            reply = ftp.storbinary(f"STOR {filename}", stream)
     except error_perm as e:
         print(f"[ERROR] Permission denied for {filename!r}: {e}")
-    except Exception as e:
-        print(f"[ERROR] Upload failed for {filename!r}: {e}")
+        return False
+    if not reply.startswith('2'):
+        print(f"[ERROR] Upload of {filename!r} not confirmed: {reply}")
+        return False
+    print(f"[SUCCESS] Uploaded {filename!r}")
+    return True
 
-def gather_buffered_files():
+def iter_buffered_files(settle: float = 0.0):
     """
-    Returns a list of (file-handle, filename) tuples
-    for every file inside BUFFER_DIR.
+    Yields (path, filename) for files in BUFFER_DIR, one directory entry at a time.
+    Files modified within the last `settle` seconds are skipped as possibly still being written.
     """
-    items = []
     if not os.path.isdir(BUFFER_DIR):
         print(f"[WARN] Buffer dir '{BUFFER_DIR}' does not exist.")
-        return items
+        return
+    cutoff = time.time() - settle
+    with os.scandir(BUFFER_DIR) as entries:
+        for entry in entries:
+            try:
+                if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                    continue
+            except OSError:
+                continue  # Removed while listing
+            yield entry.path, entry.name
 
-    for fname in os.listdir(BUFFER_DIR):
-        path = os.path.join(BUFFER_DIR, fname)
-        if os.path.isfile(path):
+def drain(ftp: FTP, settle: float = 0.0, skip: dict = None):
+    """
+    Uploads every buffered file and deletes each one right after its upload is confirmed.
+    Files that fail stay in the buffer. `skip` maps filename -> mtime of files the server refused;
+    they are not retried until they change. Returns (uploaded, failed) counts.
+    """
+    uploaded = failed = 0
+    skip = skip if skip is not None else {}
+    for path, name in iter_buffered_files(settle):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if skip.get(name) == mtime:
+            continue
+        if upload_path(ftp, path, name):
+            skip.pop(name, None)
             try:
-                f = open(path, "rb")
-                items.append((f, fname))
-            except Exception as e:
-                print(f"[WARN] Couldn't open {fname!r}: {e}")
-    return items
+                os.remove(path)
+            except OSError as e:
+                print(f"[WARN] Uploaded but couldn't remove {name!r}: {e}")
+            uploaded += 1
+        else:
+            skip[name] = mtime
+            failed += 1
+    return uploaded, failed
 
-def clean_buffer():
-    """Delete the entire BUFFER_DIR and recreate it empty."""
-    if os.path.isdir(BUFFER_DIR):
-        shutil.rmtree(BUFFER_DIR, ignore_errors=True)
+def close(ftp: FTP):
+    try:
+        ftp.quit()
+    except all_errors:
+        ftp.close()
+    print("[INFO] FTP session closed.")
+
+def watch(poll: float = POLL_SECONDS, settle: float = SETTLE_SECONDS, keepalive: float = KEEPALIVE_SECONDS):
+    """
+    Runs until interrupted: polls BUFFER_DIR and uploads new files as they land over one persistent
+    connection, sending NOOP while idle so the server doesn't drop it. A lost connection is reopened
+    on the next poll; files are only ever deleted after a confirmed upload.
+    """
     os.makedirs(BUFFER_DIR, exist_ok=True)
-    print(f"[INFO] Emptied buffer dir '{BUFFER_DIR}'")
+    print(f"[INFO] Watching '{BUFFER_DIR}' (Ctrl+C to stop)")
+    ftp = None
+    skip = {}
+    last_activity = time.monotonic()
+    try:
+        while True:
+            try:
+                if ftp is None:
+                    ftp = connect()
+                    last_activity = time.monotonic()
+                uploaded, failed = drain(ftp, settle, skip)
+                if uploaded or failed:
+                    print(f"[INFO] Uploaded {uploaded} file(s), {failed} failed.")
+                    last_activity = time.monotonic()
+                elif time.monotonic() - last_activity >= keepalive:
+                    ftp.voidcmd("NOOP")
+                    last_activity = time.monotonic()
+            except all_errors as e:
+                print(f"[ERROR] Connection problem: {e}. Retrying in {poll:.0f}s.")
+                if ftp is not None:
+                    ftp.close()
+                ftp = None
+            time.sleep(poll)
+    except KeyboardInterrupt:
+        print("[INFO] Stopped watching.")
+    finally:
+        if ftp is not None:
+            close(ftp)
 
 def main():
-    # 1) Gather files
-    items = gather_buffered_files()
-    if not items:
-        print("[INFO] No files to upload. Exiting.")
-        return
-
-    # 2) Connect & login
-    ftp = FTP()
-    print(f"[INFO] Connecting to {FTP_HOST}:{FTP_PORT}…")
-    ftp.connect(FTP_HOST, FTP_PORT)
-    ftp.login(FTP_USER, FTP_PASS)
-    print(f"[INFO] Logged in as {FTP_USER!r}")
-    if FTP_REMOTE_DIR:
-        ftp.cwd(FTP_REMOTE_DIR)
-        print(f"[INFO] Changed to remote dir '{FTP_REMOTE_DIR}'")
-
-    # 3) Upload each file
-    for stream, name in items:
-        upload_stream(ftp, stream, name)
-        stream.close()
+    parser = argparse.ArgumentParser(description=f"Upload the files in '{BUFFER_DIR}' and remove each once it's on the server")
+    parser.add_argument('--watch', action='store_true', help='Keep running and upload new files as they appear')
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help='Seconds between buffer scans in watch mode')
+    args = parser.parse_args()
 
-    # 4) Finish FTP session
-    ftp.quit()
-    print("[INFO] FTP session closed.")
+    if args.watch:
+        watch(poll=args.poll)
+        return
 
-    # 5) Clean buffer folder
-    clean_buffer()
+    # One pass: connect only if there is something to send
+    if next(iter_buffered_files(), None) is None:
+        print("[INFO] No files to upload. Exiting.")
+        return
+    ftp = connect()
+    try:
+        uploaded, failed = drain(ftp)
+        print(f"[INFO] Uploaded {uploaded} file(s), {failed} left in '{BUFFER_DIR}'.")
+    finally:
+        close(ftp)
 
 if __name__ == "__main__":
     main()
@@ -15,8 +15,12 @@ FTP_PORT = int(os.getenv('FTP_PORT', '2121'))
 FTP_USER = os.getenv('FTP_USER', 'anonymous')
 FTP_PASS = os.getenv('FTP_PASS', '')
 FTP_REMOTE_DIR = os.getenv('FTP_REMOTE_DIR', '')
-FTP_BLOCK_SIZE = int(os.getenv('FTP_BLOCK_SIZE', '8192'))
+FTP_BLOCK_SIZE = int(os.getenv('FTP_BLOCK_SIZE', '65536'))  # Starting block size; adapts during transfers
 FTP_RETRIES = int(os.getenv('FTP_RETRIES', '3'))
+FTP_CONNECTIONS = int(os.getenv('FTP_CONNECTIONS', '1'))
+FTP_VERIFY = os.getenv('FTP_VERIFY') or None  # 'size' or 'md5'
+FTP_SYNC = os.getenv('FTP_SYNC', '') == '1'  # Pick a folder and upload only what changed since the last sync
+FTP_SYNC_DELETE = os.getenv('FTP_SYNC_DELETE', '') == '1'  # Also remove remote files deleted locally
 
 
 def get_ui_files():
@@ -37,6 +41,13 @@ def get_ui_files():
     uploader.disconnect()
     print("[INFO] All done.")
 
+def get_ui_folder():
+    root = tk.Tk()
+    root.withdraw()
+    folder = filedialog.askdirectory(title="Select folder to sync")
+    root.destroy()
+    return folder
+
 if __name__ == '__main__':
     try:
         uploader = FTPUploader(
@@ -46,11 +57,22 @@ if __name__ == '__main__':
             passwd=FTP_PASS,    
             remote_dir=FTP_REMOTE_DIR,
             block_size=FTP_BLOCK_SIZE,
-            retries=FTP_RETRIES
+            retries=FTP_RETRIES,
+            verify=FTP_VERIFY
         )
 
-        file_paths = get_ui_files()
-        uploader.upload_files(file_paths)
+        if FTP_SYNC:
+            folder = get_ui_folder()
+            if folder:
+                uploader.sync(folder, delete=FTP_SYNC_DELETE, connections=FTP_CONNECTIONS)
+            else:
+                print("[INFO] No folder selected.")
+        else:
+            file_paths = get_ui_files()
+            if FTP_CONNECTIONS > 1:
+                uploader.upload_files_parallel(file_paths, connections=FTP_CONNECTIONS)
+            else:
+                uploader.upload_files(file_paths)
         uploader.disconnect()
         print("[INFO] All done.")
         
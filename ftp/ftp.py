@@ -1,7 +1,54 @@
+import hashlib
+import json
 import os
-from ftplib import FTP, error_perm
+import queue
+import re
+import socket
+import threading
+import time
+from ftplib import FTP, error_perm, error_reply
 from tqdm import tqdm
 
+MANIFEST_NAME = '.ftpsync.json'
+# File type + permission bits opening a Unix LIST line, e.g. '-rw-r--r--', 'drwxr-xr-x', 'lrwxrwxrwx', 'crw-rw----+'
+UNIX_MODE = re.compile(r'[-a-zA-Z][-rwxsStTlL]{9}[+.@]?$')
+
+
+def fast_hash(path: str, size: int, sample: int = 64 * 1024) -> str:
+    """BLAKE2 of the size and the first and last `sample` bytes. Cheap change detection, not an integrity check."""
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        h.update(f.read(sample))
+        if size > sample:
+            f.seek(max(sample, size - sample))
+            h.update(f.read(sample))
+    return h.hexdigest()
+
+
+class Manifest:
+    """
+    What was last synced from a local tree, per remote target: {target: {relpath: [size, mtime_ns, hash]}}.
+    Stored as JSON next to the files unless another path is given.
+    """
+    def __init__(self, path: str, target: str):
+        self.path = path
+        self.target = target
+        self._data = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Ignoring unreadable manifest '{path}': {e}")
+        self.entries = self._data.setdefault(target, {})
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f)
+        os.replace(tmp, self.path)
+
+
 class FTPUploader:
     """
     A class to manage FTP connection and file uploads with retries and progress bars.
@@ -13,10 +60,30 @@ class FTPUploader:
         user: str = 'anonymous',
         passwd: str = '',
         remote_dir: str = '',
-        block_size: int = 8192,
+        block_size: int = 65536,
         retries: int = 3,
-        timeout: int = 10
+        timeout: int = 10,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        verify: str = None,
+        adaptive: bool = True,
+        max_block_size: int = 4 * 1024 * 1024,
+        socket_buffer: int = 4 * 1024 * 1024,
+        progress_hz: float = 10.0
     ):
+        """
+        Data is read into one reused buffer and sent `block_size` bytes at a time. With `adaptive`, the block
+        grows while sends complete quickly and shrinks when they stall, between block_size / 8 and
+        max_block_size. `socket_buffer` sets SO_SNDBUF on data connections (0 leaves the OS default).
+        Progress bars are refreshed at most `progress_hz` times per second (0 for every block).
+
+        Failed transfers are retried up to `retries` times, waiting backoff, 2*backoff, 4*backoff... seconds
+        (capped at max_backoff) and resuming from the bytes the server already has.
+        `verify` checks each finished upload: 'size' compares file sizes, 'md5' asks the server for a checksum
+        (XMD5 or HASH) and falls back to size when it can't give one. A mismatch counts as a failed attempt.
+        """
+        if verify not in (None, 'size', 'md5'):
+            raise ValueError(f"verify must be None, 'size' or 'md5', not {verify!r}")
         self.host = host
         self.port = port
         self.user = user
@@ -25,7 +92,16 @@ class FTPUploader:
         self.block_size = block_size
         self.retries = retries
         self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.verify = verify
+        self.adaptive = adaptive
+        self.max_block_size = max(max_block_size, block_size)
+        self.socket_buffer = socket_buffer
+        self.progress_hz = progress_hz
+        self._buffer = None  # Reused across transfers on this session
         self.ftp = None
+        self._mlsd = True  # Cleared once the server refuses MLSD, so later listings go straight to LIST
         
         self.ftp_connect()
 
@@ -57,15 +133,42 @@ class FTPUploader:
         self.disconnect()
         self.ftp_connect()
 
-    def upload_file(self, file_path: str):
-        """Uploads a single file with progress bar and retry logic."""
+    def clone(self) -> 'FTPUploader':
+        """Opens another logged-in session with the same settings."""
+        return FTPUploader(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            passwd=self.passwd,
+            remote_dir=self.remote_dir,
+            block_size=self.block_size,
+            retries=self.retries,
+            timeout=self.timeout,
+            backoff=self.backoff,
+            max_backoff=self.max_backoff,
+            verify=self.verify,
+            adaptive=self.adaptive,
+            max_block_size=self.max_block_size,
+            socket_buffer=self.socket_buffer,
+            progress_hz=self.progress_hz
+        )
+
+    def upload_file(self, file_path: str, pbar: tqdm = None, lock: threading.Lock = None, remote_name: str = None) -> bool:
+        """
+        Uploads a single file with progress bar and retry logic. Returns True on success.
+        If `pbar` is given, progress goes to that shared bar (guarded by `lock`) instead of a per-file bar.
+        `remote_name` (relative to the remote directory, '/'-separated) defaults to the file's basename.
+        """
         if not os.path.isfile(file_path):
             print(f"[ERROR] '{file_path}' is not a file. Skipping.")
-            return
+            return False
 
-        filename = os.path.basename(file_path)
+        filename = remote_name or os.path.basename(file_path)
         size = os.path.getsize(file_path)
 
+        if pbar is not None:
+            return self._upload_with_retries(file_path, filename, pbar, lock or threading.Lock())
+
         with tqdm(
             total=size,
             unit='B',
@@ -74,31 +177,366 @@ class FTPUploader:
             leave=True,
             ascii=True
         ) as pbar:
+            return self._upload_with_retries(file_path, filename, pbar, threading.Lock())
 
-            def callback(chunk: bytes):
-                pbar.update(len(chunk))
+    def _upload_with_retries(self, file_path: str, filename: str, pbar: tqdm, lock: threading.Lock) -> bool:
+        size = os.path.getsize(file_path)
+        shown = 0  # Bytes of this file currently counted on the progress bar
+        sent = 0  # Bytes of this file the server has been sent, shown on the bar at most progress_hz times a second
+        interval = 1.0 / self.progress_hz if self.progress_hz else 0.0
+        offset = 0  # Where the next attempt starts
+        restart = False  # Set when the remote copy is bad and must not be resumed
+        for attempt in range(1, self.retries + 1):
+            try:
+                if attempt > 1:
+                    delay = min(self.backoff * 2 ** (attempt - 2), self.max_backoff)
+                    print(f"[INFO] Retrying '{filename}' in {delay:.1f}s...")
+                    time.sleep(delay)
+                    self.reconnect()
+                    offset = 0 if restart else self._resume_offset(filename, size)
+                    restart = False
+                # Move the bar back to the resume point; anything past it is sent again
+                with lock:
+                    pbar.update(offset - shown)
+                shown = sent = offset
+                last = time.monotonic()
+
+                def callback(n: int):
+                    nonlocal sent, shown, last
+                    sent += n
+                    now = time.monotonic()
+                    if now - last >= interval:
+                        with lock:
+                            pbar.update(sent - shown)
+                        shown, last = sent, now
 
-            for attempt in range(1, self.retries + 1):
                 try:
                     with open(file_path, 'rb') as f:
-                        self.ftp.storbinary(f'STOR {filename}', f, self.block_size, callback)
-                    print(f"[SUCCESS] Uploaded '{filename}'.")
-                    return
+                        self._store(filename, f, offset, callback)
+                finally:
+                    with lock:
+                        pbar.update(sent - shown)
+                    shown = sent
 
-                except error_perm as e:
-                    print(f"[ERROR] Permission denied uploading '{filename}': {e}")
-                    return
+                if self.verify and not self._verify(file_path, filename, size):
+                    restart = True
+                    raise IOError("verification failed")
+                print(f"[SUCCESS] Uploaded '{filename}'" + (f" (resumed at {offset} bytes)." if offset else "."))
+                return True
 
-                except Exception as e:
-                    print(f"[ERROR] Attempt {attempt}/{self.retries} failed for '{filename}': {e}")
-                    if attempt < self.retries:
-                        self.reconnect()
-                    else:
-                        print(f"[WARNING] Failed to upload '{filename}' after {self.retries} attempts.")
+            except error_perm as e:
+                print(f"[ERROR] Permission denied uploading '{filename}': {e}")
+                return False
+
+            except Exception as e:
+                print(f"[ERROR] Attempt {attempt}/{self.retries} failed for '{filename}': {e}")
+        print(f"[WARNING] Failed to upload '{filename}' after {self.retries} attempts.")
+        with lock:
+            pbar.update(-shown)
+        return False
+
+    def _remote_size(self, filename: str):
+        """Size of `filename` on the server, or None if it doesn't exist or SIZE isn't supported."""
+        try:
+            self.ftp.voidcmd('TYPE I')  # Many servers refuse SIZE in ASCII mode
+            return self.ftp.size(filename)
+        except (error_perm, error_reply):
+            return None
+
+    def _resume_offset(self, filename: str, size: int) -> int:
+        """Bytes of `filename` already on the server, or 0 when there is nothing usable to resume from."""
+        remote = self._remote_size(filename)
+        if remote is None or remote > size:
+            return 0
+        return remote
+
+    def _store(self, filename: str, f, offset: int, callback):
+        """Sends `f` from `offset`: REST + STOR where the server supports it, otherwise APPE."""
+        if not offset:
+            self._storbinary(f'STOR {filename}', f, callback)
+            return
+        f.seek(offset)
+        try:
+            self._storbinary(f'STOR {filename}', f, callback, rest=offset)
+        except (error_perm, error_reply) as e:
+            if isinstance(e, error_perm) and not str(e).startswith(('500', '501', '502', '504')):
+                raise
+            f.seek(offset)
+            self._storbinary(f'APPE {filename}', f, callback)
+
+    def _storbinary(self, cmd: str, f, callback, rest: int = None) -> str:
+        """
+        ftplib's storbinary, minus a bytes object per block: reads with readinto into one buffer, raises the
+        send buffer, and adapts the block size to how long each send takes. callback(n) gets the bytes sent.
+        """
+        self.ftp.voidcmd('TYPE I')
+        capacity = self.max_block_size if self.adaptive else self.block_size
+        if self._buffer is None or len(self._buffer) < capacity:
+            self._buffer = memoryview(bytearray(capacity))
+        buf = self._buffer
+        block = self.block_size
+        min_block = max(self.block_size // 8, 4096)
+        with self.ftp.transfercmd(cmd, rest) as conn:
+            if self.socket_buffer:
+                try:
+                    conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_buffer)
+                except OSError:
+                    pass  # Some platforms cap or refuse it; the default still works
+            while True:
+                n = f.readinto(buf[:block])
+                if not n:
+                    break
+                start = time.perf_counter()
+                conn.sendall(buf[:n])
+                elapsed = time.perf_counter() - start
+                callback(n)
+                if self.adaptive:
+                    # Aim for sends of roughly 10-100 ms: big enough to amortize per-block overhead,
+                    # small enough that a stalled link still shows progress and a retry loses little
+                    if elapsed < 0.01 and block < self.max_block_size:
+                        block = min(block * 2, self.max_block_size)
+                    elif elapsed > 0.1 and block > min_block:
+                        block = max(block // 2, min_block)
+            unwrap = getattr(conn, 'unwrap', None)  # FTP_TLS data connections
+            if unwrap:
+                unwrap()
+        return self.ftp.voidresp()
+
+    def _verify(self, file_path: str, filename: str, size: int) -> bool:
+        if self.verify == 'md5':
+            remote = self._remote_md5(filename)
+            if remote is not None:
+                with open(file_path, 'rb') as f:
+                    local = hashlib.md5()
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        local.update(block)
+                if remote.lower() == local.hexdigest():
+                    return True
+                print(f"[ERROR] Checksum mismatch for '{filename}'.")
+                return False
+        remote_size = self._remote_size(filename)
+        if remote_size != size:
+            print(f"[ERROR] Size mismatch for '{filename}': {remote_size} on server, {size} local.")
+            return False
+        return True
+
+    def _remote_md5(self, filename: str):
+        """Server-side MD5 via XMD5 or HASH, or None if the server offers neither."""
+        for command in (f'XMD5 {filename}', f'HASH {filename}'):
+            try:
+                if command.startswith('HASH'):
+                    self.ftp.sendcmd('OPTS HASH MD5')
+                reply = self.ftp.sendcmd(command)
+            except (error_perm, error_reply):
+                continue
+            words = reply.split()
+            # XMD5: "250 <hex>", HASH: "213 MD5 0-<end> <hex> <filename>"
+            digest = words[1] if command.startswith('XMD5') else (words[3] if len(words) > 3 else '')
+            if len(digest) == 32:
+                return digest
+        print(f"[WARNING] Server can't checksum '{filename}'; verifying size only.")
+        self.verify = 'size'
+        return None
 
     def upload_files(self, file_paths):
         """Uploads multiple files in sequence."""
         for path in file_paths:
             self.upload_file(path)
 
+    def upload_files_parallel(self, file_paths, connections: int = 4):
+        """
+        Uploads files over `connections` sessions at once, each taking the next file from a shared queue.
+        Files are queued largest first, so a big file never starts last and leaves the other sessions idle.
+        Entries may also be (path, remote_name) pairs. Returns (uploaded, failed) lists of paths.
+        """
+        items = [item if isinstance(item, tuple) else (item, None) for item in file_paths]
+        for p, _ in items:
+            if not os.path.isfile(p):
+                print(f"[ERROR] '{p}' is not a file. Skipping.")
+        items = [item for item in items if os.path.isfile(item[0])]
+        items.sort(key=lambda item: os.path.getsize(item[0]), reverse=True)
+        paths = [p for p, _ in items]
+        jobs = queue.Queue()
+        for item in items:
+            jobs.put(item)
+
+        uploaded, failed = [], []
+        lock = threading.Lock()
+        total = sum(os.path.getsize(p) for p in paths)
+
+        with tqdm(
+            total=total,
+            unit='B',
+            unit_scale=True,
+            desc=f"Uploading {len(paths)} files over {connections} connections",
+            leave=True,
+            ascii=True
+        ) as pbar:
+
+            def worker(first: bool):
+                # Extra sessions log in from their own thread, so connection setup overlaps too
+                try:
+                    session = self if first else self.clone()
+                except Exception as e:
+                    print(f"[ERROR] Could not open an extra connection: {e}")
+                    return
+                try:
+                    while True:
+                        try:
+                            path, remote_name = jobs.get_nowait()
+                        except queue.Empty:
+                            return
+                        ok = session.upload_file(path, pbar=pbar, lock=lock, remote_name=remote_name)
+                        with lock:
+                            (uploaded if ok else failed).append(path)
+                finally:
+                    if session is not self:
+                        session.disconnect()
+
+            count = max(1, min(connections, len(paths)))
+            threads = [threading.Thread(target=worker, args=(i == 0,), daemon=True) for i in range(count)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        print(f"[INFO] Uploaded {len(uploaded)} file(s), {len(failed)} failed.")
+        return uploaded, failed
+
+    def sync(self, local_dir: str, manifest_path: str = None, delete: bool = False, connections: int = 1):
+        """
+        Mirrors local_dir, subdirectories included, into the remote directory and uploads only what changed.
+        The remote tree is listed once; a file is skipped when the server has it at the same size and the
+        manifest's size/mtime (or, if those moved, its fast hash) still match. Files already on the server at
+        the right size but missing from the manifest are adopted rather than uploaded again.
+        With `delete`, remote files and directories that no longer exist locally are removed.
+        Returns (uploaded, failed, deleted) lists of relative paths.
+        """
+        manifest_path = manifest_path or os.path.join(local_dir, MANIFEST_NAME)
+        target = f"{self.user}@{self.host}:{self.port}/{self.remote_dir.strip('/')}"
+        manifest = Manifest(manifest_path, target)
+        skip = {os.path.abspath(manifest_path), os.path.abspath(manifest_path) + '.tmp'}
+        local_files, local_dirs = self._scan_local(local_dir, skip)
+        remote_files, remote_dirs = self._list_remote()
+        print(f"[INFO] {len(local_files)} local file(s), {len(remote_files)} remote file(s).")
+
+        pending, hashes = [], {}
+        for rel, (path, size, mtime) in local_files.items():
+            known = manifest.entries.get(rel)
+            if remote_files.get(rel) == size:
+                if known and known[0] == size and known[1] == mtime:
+                    continue
+                digest = fast_hash(path, size)
+                if known is None or known[2] == digest:
+                    manifest.entries[rel] = [size, mtime, digest]
+                    continue
+                hashes[rel] = digest
+            pending.append(rel)
+
+        for d in sorted(local_dirs - remote_dirs):
+            try:
+                self.ftp.mkd(d)
+            except error_perm as e:
+                print(f"[ERROR] Could not create remote directory '{d}': {e}")
+
+        uploaded, failed, deleted = [], [], []
+        try:
+            if pending:
+                by_path = {local_files[rel][0]: rel for rel in pending}
+                done, _ = self.upload_files_parallel([(local_files[rel][0], rel) for rel in pending], connections)
+                for path in done:
+                    rel = by_path[path]
+                    _, size, mtime = local_files[rel]
+                    manifest.entries[rel] = [size, mtime, hashes.get(rel) or fast_hash(path, size)]
+                    uploaded.append(rel)
+                failed = sorted(set(pending) - set(uploaded))
+
+            if delete:
+                for rel in sorted(set(remote_files) - set(local_files)):
+                    try:
+                        self.ftp.delete(rel)
+                        deleted.append(rel)
+                    except error_perm as e:
+                        print(f"[ERROR] Could not delete '{rel}': {e}")
+                    manifest.entries.pop(rel, None)
+                for d in sorted(remote_dirs - local_dirs, key=lambda d: d.count('/'), reverse=True):
+                    try:
+                        self.ftp.rmd(d)
+                        deleted.append(d + '/')
+                    except error_perm as e:
+                        print(f"[ERROR] Could not remove directory '{d}': {e}")
+        finally:
+            for rel in set(manifest.entries) - set(local_files):
+                del manifest.entries[rel]
+            manifest.save()
+
+        unchanged = len(local_files) - len(pending)
+        print(f"[INFO] Sync done: {len(uploaded)} uploaded, {len(failed)} failed, {unchanged} unchanged, {len(deleted)} deleted.")
+        return uploaded, failed, deleted
+
+    @staticmethod
+    def _scan_local(root: str, skip=()):
+        """Returns ({relpath: (path, size, mtime_ns)}, {reldir}) for everything under root, '/'-separated."""
+        files, dirs = {}, set()
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            with os.scandir(os.path.join(root, rel_dir)) as it:
+                for entry in it:
+                    rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.add(rel)
+                        stack.append(rel)
+                    elif entry.is_file() and os.path.abspath(entry.path) not in skip:
+                        st = entry.stat()
+                        files[rel] = (entry.path, st.st_size, st.st_mtime_ns)
+        return files, dirs
+
+    def _list_remote(self):
+        """Returns ({relpath: size}, {reldir}) for the remote directory tree, one listing per directory."""
+        files, dirs = {}, set()
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            for name, is_dir, size in self._list_dir(rel_dir):
+                rel = f"{rel_dir}/{name}" if rel_dir else name
+                if is_dir:
+                    dirs.add(rel)
+                    stack.append(rel)
+                else:
+                    files[rel] = size
+        return files, dirs
+
+    def _list_dir(self, path: str):
+        """(name, is_dir, size) for each entry of one remote directory, via MLSD or, if unsupported, LIST."""
+        if self._mlsd:
+            try:
+                entries = list(self.ftp.mlsd(path))
+                return [(name, facts.get('type') == 'dir', int(facts.get('size', 0)))
+                        for name, facts in entries if facts.get('type') in ('file', 'dir')]
+            except error_perm as e:
+                if not str(e).startswith(('500', '501', '502')):
+                    raise
+                self._mlsd = False
+        lines = []
+        self.ftp.retrlines(f'LIST {path}' if path else 'LIST', lines.append)
+        return [entry for entry in map(self._parse_list_line, lines) if entry]
 
+    @staticmethod
+    def _parse_list_line(line: str):
+        """Parses a Unix-style ('-rw-r--r-- 1 u g 123 Jan 1 12:00 name') or DOS-style LIST line."""
+        parts = line.split(None, 8)
+        if parts and UNIX_MODE.match(parts[0]):
+            # Only plain files and directories are synced; symlinks, devices, sockets etc. are skipped here
+            # rather than misread as DOS lines (and later deleted as stray files)
+            if len(parts) != 9 or parts[0][0] not in ('-', 'd'):
+                return None
+            name, is_dir, size = parts[8], parts[0][0] == 'd', parts[4]
+        else:
+            parts = line.split(None, 3)
+            if len(parts) != 4:
+                return None
+            name, is_dir, size = parts[3], parts[2] == '<DIR>', parts[2]
+        if name in ('.', '..'):
+            return None
+        return name, is_dir, 0 if is_dir or not size.isdigit() else int(size)
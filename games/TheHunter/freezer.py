@@ -0,0 +1,340 @@
+"""
+Suspend and resume a whole process without snapshotting every thread on the system per toggle.
+
+    freezer = make_freezer(pid)   # Picks the backend for this OS
+    freezer.toggle()              # Freeze / thaw, returns True if now frozen
+    freezer.close()               # Thaws if still frozen and releases handles
+
+Backends:
+    ntsuspend  Windows: NtSuspendProcess/NtResumeProcess on one process handle opened once.
+    threads    Windows fallback: SuspendThread/ResumeThread with thread handles kept open between toggles.
+    signal     POSIX: SIGSTOP/SIGCONT to the process and, with tree=True, its children.
+    cgroup     Linux cgroup v2: writes cgroup.freeze for the cgroup the process is in. This freezes every
+               process in that cgroup, so only use it when the target runs in its own (e.g. systemd-run --scope).
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+BACKENDS = ('ntsuspend', 'threads', 'signal', 'cgroup')
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    TH32CS_SNAPTHREAD = 0x00000004
+    THREAD_SUSPEND_RESUME = 0x0002
+    THREAD_QUERY_LIMITED_INFORMATION = 0x0800
+    STILL_ACTIVE = 259
+    PROCESS_SUSPEND_RESUME = 0x0800
+    INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+    class THREADENTRY32(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ThreadID", wintypes.DWORD),
+            ("th32OwnerProcessID", wintypes.DWORD),
+            ("tpBasePri", wintypes.LONG),
+            ("tpDeltaPri", wintypes.LONG),
+            ("dwFlags", wintypes.DWORD),
+        ]
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    ntdll = ctypes.WinDLL('ntdll')
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.OpenThread.restype = wintypes.HANDLE
+    kernel32.OpenThread.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.CreateToolhelp32Snapshot.argtypes = (wintypes.DWORD, wintypes.DWORD)
+    kernel32.SuspendThread.restype = wintypes.DWORD
+    kernel32.SuspendThread.argtypes = (wintypes.HANDLE,)
+    kernel32.ResumeThread.restype = wintypes.DWORD
+    kernel32.ResumeThread.argtypes = (wintypes.HANDLE,)
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    kernel32.GetExitCodeThread.restype = wintypes.BOOL
+    kernel32.GetExitCodeThread.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    ntdll.NtSuspendProcess.restype = wintypes.LONG
+    ntdll.NtSuspendProcess.argtypes = (wintypes.HANDLE,)
+    ntdll.NtResumeProcess.restype = wintypes.LONG
+    ntdll.NtResumeProcess.argtypes = (wintypes.HANDLE,)
+
+
+class Freezer:
+    """Freezes and thaws one process. Subclasses implement _freeze/_thaw; state is tracked here."""
+    name = ''
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.frozen = False
+
+    def freeze(self):
+        if not self.frozen:
+            self._freeze()
+            self.frozen = True
+
+    def thaw(self):
+        if self.frozen:
+            self._thaw()
+            self.frozen = False
+
+    def toggle(self) -> bool:
+        """Freeze if running, thaw if frozen. Returns True if the process is now frozen."""
+        self.thaw() if self.frozen else self.freeze()
+        return self.frozen
+
+    def close(self):
+        """Thaw (never leave the target frozen) and release any handles."""
+        self.thaw()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _freeze(self):
+        raise NotImplementedError
+
+    def _thaw(self):
+        raise NotImplementedError
+
+
+class NtSuspendFreezer(Freezer):
+    """Windows: one kernel call suspends every thread of the process, on a handle opened once."""
+    name = 'ntsuspend'
+
+    def __init__(self, pid: int):
+        super().__init__(pid)
+        self.handle = kernel32.OpenProcess(PROCESS_SUSPEND_RESUME, False, pid)
+        if not self.handle:
+            raise OSError(ctypes.get_last_error(), f"OpenProcess failed for pid {pid}")
+
+    def _freeze(self):
+        status = ntdll.NtSuspendProcess(self.handle)
+        if status < 0:
+            raise OSError(f"NtSuspendProcess failed for pid {self.pid} (NTSTATUS {status & 0xFFFFFFFF:#x})")
+
+    def _thaw(self):
+        status = ntdll.NtResumeProcess(self.handle)
+        if status < 0:
+            raise OSError(f"NtResumeProcess failed for pid {self.pid} (NTSTATUS {status & 0xFFFFFFFF:#x})")
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            if self.handle:
+                kernel32.CloseHandle(self.handle)
+                self.handle = None
+
+
+class ThreadFreezer(Freezer):
+    """
+    Windows fallback: suspends each thread. Handles stay open between toggles, and thawing resumes exactly
+    the threads that were suspended, so only freezing needs a thread snapshot (to pick up new threads).
+    Windows reuses thread IDs, so each freeze drops handles of threads that have exited: a stale handle
+    would point at the dead thread and leave the new one with the same ID running.
+    """
+    name = 'threads'
+
+    def __init__(self, pid: int):
+        super().__init__(pid)
+        self.handles: Dict[int, int] = {}
+        self._suspended: List[int] = []
+
+    def _thread_ids(self) -> List[int]:
+        snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPTHREAD, 0)
+        if snapshot == INVALID_HANDLE_VALUE:
+            raise OSError(ctypes.get_last_error(), "CreateToolhelp32Snapshot failed")
+        te32 = THREADENTRY32()
+        te32.dwSize = ctypes.sizeof(THREADENTRY32)
+        tids = []
+        try:
+            success = kernel32.Thread32First(snapshot, ctypes.byref(te32))
+            while success:
+                if te32.th32OwnerProcessID == self.pid:
+                    tids.append(te32.th32ThreadID)
+                success = kernel32.Thread32Next(snapshot, ctypes.byref(te32))
+        finally:
+            kernel32.CloseHandle(snapshot)
+        return tids
+
+    @staticmethod
+    def _alive(handle) -> bool:
+        code = wintypes.DWORD()
+        return bool(kernel32.GetExitCodeThread(handle, ctypes.byref(code))) and code.value == STILL_ACTIVE
+
+    def _drop(self, tid: int):
+        kernel32.CloseHandle(self.handles.pop(tid))
+
+    def _freeze(self):
+        tids = self._thread_ids()
+        for tid in set(self.handles) - set(tids):
+            self._drop(tid)  # Exited since the last freeze
+        for tid in tids:
+            handle = self.handles.get(tid)
+            if handle is not None and not self._alive(handle):
+                self._drop(tid)  # The cached thread exited and its ID now belongs to a new thread
+                handle = None
+            if handle is None:
+                handle = kernel32.OpenThread(THREAD_SUSPEND_RESUME | THREAD_QUERY_LIMITED_INFORMATION, False, tid)
+                if not handle:
+                    continue  # Thread exited since the snapshot
+                self.handles[tid] = handle
+            if kernel32.SuspendThread(handle) != 0xFFFFFFFF:
+                self._suspended.append(handle)
+
+    def _thaw(self):
+        for handle in self._suspended:
+            kernel32.ResumeThread(handle)
+        self._suspended.clear()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for handle in self.handles.values():
+                kernel32.CloseHandle(handle)
+            self.handles.clear()
+
+
+class SignalFreezer(Freezer):
+    """POSIX: SIGSTOP/SIGCONT. With `tree`, children (looked up at freeze time) are stopped too."""
+    name = 'signal'
+
+    def __init__(self, pid: int, tree: bool = False):
+        super().__init__(pid)
+        self.tree = tree
+        self._pids: List[int] = []
+
+    def _freeze(self):
+        pids = [self.pid]
+        if self.tree:
+            import psutil
+            pids += [child.pid for child in psutil.Process(self.pid).children(recursive=True)]
+        for pid in pids:
+            os.kill(pid, signal.SIGSTOP)
+        self._pids = pids
+
+    def _thaw(self):
+        for pid in reversed(self._pids):
+            try:
+                os.kill(pid, signal.SIGCONT)
+            except ProcessLookupError:
+                pass
+
+
+class CgroupFreezer(Freezer):
+    """Linux cgroup v2: freezes the target's whole cgroup (process tree included) with one write."""
+    name = 'cgroup'
+
+    def __init__(self, pid: int, root: str = '/sys/fs/cgroup', timeout: float = 1.0):
+        super().__init__(pid)
+        self.timeout = timeout
+        with open(f'/proc/{pid}/cgroup') as f:
+            paths = [line.strip().split('::', 1)[1] for line in f if line.startswith('0::')]
+        if not paths:
+            raise OSError(f"pid {pid} is not in a cgroup v2 hierarchy")
+        self.path = os.path.join(root, paths[0].lstrip('/')).rstrip('/')
+        if not os.access(os.path.join(self.path, 'cgroup.freeze'), os.W_OK):
+            raise PermissionError(f"Can't write {self.path}/cgroup.freeze")
+
+    def _set(self, value: str):
+        with open(os.path.join(self.path, 'cgroup.freeze'), 'w') as f:
+            f.write(value)
+        # The write only requests the change; wait until the kernel reports it done
+        deadline = time.perf_counter() + self.timeout
+        while time.perf_counter() < deadline:
+            with open(os.path.join(self.path, 'cgroup.events')) as f:
+                if f'frozen {value}' in f.read().split('\n'):
+                    return
+            time.sleep(0.0005)
+        raise TimeoutError(f"cgroup {self.path} did not reach frozen={value}")
+
+    def _freeze(self):
+        self._set('1')
+
+    def _thaw(self):
+        self._set('0')
+
+
+def make_freezer(pid: int, backend: str = 'auto', **kwargs) -> Freezer:
+    """auto: ntsuspend on Windows (threads if that can't be opened), signal elsewhere."""
+    if backend == 'auto':
+        if sys.platform != 'win32':
+            return SignalFreezer(pid, **kwargs)
+        try:
+            return NtSuspendFreezer(pid)
+        except (OSError, AttributeError):
+            return ThreadFreezer(pid)
+    classes = {cls.name: cls for cls in (NtSuspendFreezer, ThreadFreezer, SignalFreezer, CgroupFreezer)}
+    if backend not in classes:
+        raise ValueError(f"Unknown backend '{backend}' (expected auto or one of {', '.join(BACKENDS)})")
+    return classes[backend](pid, **kwargs)
+
+
+# Benchmark
+
+BUSY_CHILD = """
+import sys, threading
+def spin():
+    n = 0
+    while True:
+        n += 1
+for _ in range(int(sys.argv[1])):
+    threading.Thread(target=spin, daemon=True).start()
+print('ready', flush=True)
+threading.Event().wait()
+"""
+
+
+def _percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000
+    return f"{sum(ordered) / len(ordered) * 1000:>7.3f} {pick(0.5):>7.3f} {pick(0.95):>7.3f} {ordered[-1] * 1000:>7.3f}"
+
+
+def benchmark(backend: str = 'auto', threads: int = 64, toggles: int = 200):
+    """Spawns a child running `threads` busy threads and times freeze/thaw calls against it."""
+    child = subprocess.Popen([sys.executable, '-c', BUSY_CHILD, str(threads)], stdout=subprocess.PIPE, text=True)
+    try:
+        child.stdout.readline()
+        freezer = make_freezer(child.pid, backend)
+        freeze_times, thaw_times = [], []
+        try:
+            for _ in range(toggles):
+                start = time.perf_counter()
+                freezer.freeze()
+                freeze_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                freezer.thaw()
+                thaw_times.append(time.perf_counter() - start)
+        finally:
+            freezer.close()
+        print(f"backend {freezer.name}, {threads} threads, {toggles} toggles (ms)")
+        print(f"{'':<7} {'mean':>7} {'p50':>7} {'p95':>7} {'max':>7}")
+        print(f"{'freeze':<7} {_percentiles(freeze_times)}")
+        print(f"{'thaw':<7} {_percentiles(thaw_times)}")
+    finally:
+        child.kill()
+        child.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure freeze/thaw latency against a busy child process")
+    parser.add_argument('--backend', default='auto', choices=('auto',) + BACKENDS, help='(default: auto)')
+    parser.add_argument('--threads', type=int, default=64, help='Busy threads in the child (default: 64)')
+    parser.add_argument('--toggles', type=int, default=200, help='Freeze/thaw cycles to time (default: 200)')
+    args = parser.parse_args()
+    benchmark(args.backend, args.threads, args.toggles)
+
+
+if __name__ == '__main__':
+    main()
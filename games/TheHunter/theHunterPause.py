@@ -1,97 +1,62 @@
-import os
-import psutil
-import ctypes
 import keyboard
+import threading
 import time
-from ctypes import wintypes
+from freezer import make_freezer
+from watcher import ProcessWatcher
 
-# Constants
-TH32CS_SNAPTHREAD = 0x00000004
-THREAD_SUSPEND_RESUME = 0x0002
+watcher = None  # Tracks the game process across restarts
+freezer = None  # Freezer for the current game process, created on first use
+freezer_lock = threading.Lock()
 
-# Structures
-class THREADENTRY32(ctypes.Structure):
-    _fields_ = [
-        ("dwSize", wintypes.DWORD),
-        ("cntUsage", wintypes.DWORD),
-        ("th32ThreadID", wintypes.DWORD),
-        ("th32OwnerProcessID", wintypes.DWORD),
-        ("tpBasePri", wintypes.LONG),
-        ("tpDeltaPri", wintypes.LONG),
-        ("dwFlags", wintypes.DWORD),
-    ]
-
-# Function declarations from kernel32
-CreateToolhelp32Snapshot = ctypes.windll.kernel32.CreateToolhelp32Snapshot
-Thread32First = ctypes.windll.kernel32.Thread32First
-Thread32Next = ctypes.windll.kernel32.Thread32Next
-OpenThread = ctypes.windll.kernel32.OpenThread
-SuspendThread = ctypes.windll.kernel32.SuspendThread
-ResumeThread = ctypes.windll.kernel32.ResumeThread
-CloseHandle = ctypes.windll.kernel32.CloseHandle
-
-def get_thread_ids(pid):
-    thread_ids = []
-    snapshot = CreateToolhelp32Snapshot(TH32CS_SNAPTHREAD, 0)
-    if snapshot == -1:
-        return thread_ids
-
-    te32 = THREADENTRY32()
-    te32.dwSize = ctypes.sizeof(THREADENTRY32)
-    success = Thread32First(snapshot, ctypes.byref(te32))
-    while success:
-        if te32.th32OwnerProcessID == pid:
-            thread_ids.append(te32.th32ThreadID)
-        success = Thread32Next(snapshot, ctypes.byref(te32))
-    CloseHandle(snapshot)
-    return thread_ids
-
-def suspend_process(pid):
+def suspend_process(current):
     try:
-        for tid in get_thread_ids(pid):
-            h_thread = OpenThread(THREAD_SUSPEND_RESUME, False, tid)
-            if h_thread:
-                SuspendThread(h_thread)
-                CloseHandle(h_thread)
-        print(f"Process {pid} suspended.")
+        current.freeze()
+        print(f"Process {current.pid} suspended.")
     except Exception as e:
-        print(f"Failed to suspend process {pid}: {e}")
+        print(f"Failed to suspend process {current.pid}: {e}")
 
-def resume_process(pid):
+def resume_process(current):
     try:
-        for tid in get_thread_ids(pid):
-            h_thread = OpenThread(THREAD_SUSPEND_RESUME, False, tid)
-            if h_thread:
-                while ResumeThread(h_thread) > 0:
-                    pass
-                CloseHandle(h_thread)
-        print(f"Process {pid} resumed.")
+        current.thaw()
+        print(f"Process {current.pid} resumed.")
     except Exception as e:
-        print(f"Failed to resume process {pid}: {e}")
+        print(f"Failed to resume process {current.pid}: {e}")
 
-def find_pid_by_path_or_name(name_or_path):
-    for proc in psutil.process_iter(['pid', 'exe', 'name']):
-        try:
-            if name_or_path.lower() in (proc.info['name'] or '').lower() or \
-               os.path.abspath(name_or_path).lower() == os.path.abspath(proc.info['exe'] or '').lower():
-                return proc.info['pid']
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    return None
-
-def get_process_state(pid):
-    try:
-        proc = psutil.Process(pid)
-        return proc.status()
-    except psutil.NoSuchProcess:
+def current_freezer():
+    """Freezer for the running game, or None if it isn't running. Re-created when the game restarts."""
+    global freezer
+    proc = watcher.get()
+    if proc is None:
         return None
-
-def toggle_process(pid):
-    state = get_process_state(pid)
-    if state == psutil.STATUS_STOPPED:
-        resume_process(pid)
+    with freezer_lock:
+        if freezer is None or freezer.pid != proc.pid:
+            freezer = make_freezer(proc.pid)
+        return freezer
+
+def on_attach(proc):
+    print(f"Monitoring process {proc.pid}.")
+
+def on_detach(pid):
+    global freezer
+    print(f"Process {pid} exited; waiting for it to start again.")
+    with freezer_lock:
+        if freezer is not None and freezer.pid == pid:
+            try:
+                freezer.close()
+            except Exception:
+                pass  # Nothing left to thaw; this only releases handles
+            freezer = None
+
+def toggle_process():
+    # The freezer tracks its own state; psutil never reports a thread-suspended Windows process as stopped
+    current = current_freezer()
+    if current is None:
+        print("Game process not running.")
+        return
+    if current.frozen:
+        resume_process(current)
     else:
-        suspend_process(pid)
+        suspend_process(current)
 
 # Debug/debounce mechanism to prevent multiple toggles on a single keypress
 last_toggle_time = 0
@@ -110,7 +75,7 @@ def toggle_process_callback():
         return
     last_toggle_time = current_time
     print("Toggling process state...")
-    toggle_process(pid)
+    toggle_process()
 
 def toggle_autorun_callback():
     global last_autorun_time, autorun_active
@@ -129,12 +94,10 @@ def toggle_autorun_callback():
 
 if __name__ == "__main__":
     target = r"C:\Program Files (x86)\Steam\steamapps\common\theHunterCotW\theHunterCotW_F.exe"
-    pid = find_pid_by_path_or_name(target)
-    if pid is None:
-        print("Process not found.")
-        exit()
+    watcher = ProcessWatcher(target, on_attach=on_attach, on_detach=on_detach).start()
+    if watcher.get() is None:
+        print("Process not found; waiting for it to start.")
 
-    print(f"Monitoring process {pid}.")
     print("Press Ctrl+Caps Lock+S to toggle process state.")
     print("Press Ctrl+Caps Lock+W to toggle autorun (hold/release 'w').")
     print("Press Ctrl+Alt+E to exit.")
@@ -147,4 +110,8 @@ if __name__ == "__main__":
     keyboard.wait('ctrl+alt+e')
     if autorun_active:
         keyboard.release('w')
-    resume_process(pid)
+    watcher.stop()
+    with freezer_lock:
+        if freezer is not None:
+            resume_process(freezer)
+            freezer.close()
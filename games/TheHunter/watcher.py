@@ -0,0 +1,100 @@
+import os
+import threading
+from typing import Callable, Optional
+import psutil
+
+
+class ProcessWatcher:
+    """
+    Tracks one target process by exe path or name. The process table is scanned only while the target isn't
+    running; once found, a background thread waits for it to exit and then goes back to scanning, so a
+    restarted game is picked up again. get() only checks that the held PID still belongs to the same process
+    (PID + create time), which costs the same no matter how many processes are running.
+    """
+    def __init__(self, target: str, poll: float = 2.0,
+                 on_attach: Callable[[psutil.Process], None] = None,
+                 on_detach: Callable[[int], None] = None):
+        self.target = target
+        self.poll = poll
+        self.on_attach = on_attach
+        self.on_detach = on_detach
+        # Precomputed once: compare psutil's exe paths against this instead of normalizing every candidate
+        self._exe = os.path.normcase(os.path.abspath(target)) if os.path.dirname(target) else None
+        self._name = os.path.basename(target).lower()
+        self._proc: Optional[psutil.Process] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='process-watcher', daemon=True)
+
+    def start(self) -> 'ProcessWatcher':
+        """Resolve the target now (so get() works right away if it is running) and start watching."""
+        self._attach(self.resolve())
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def get(self) -> Optional[psutil.Process]:
+        """The target process if it is still the one that was resolved, else None (and re-resolve soon)."""
+        with self._lock:
+            proc = self._proc
+        if proc is not None and proc.is_running():  # psutil compares create time, so a reused PID fails
+            return proc
+        if proc is not None:
+            self._wake.set()
+        return None
+
+    def resolve(self) -> Optional[psutil.Process]:
+        """One scan of the process table. The exe path is only fetched for processes whose name matches."""
+        for proc in psutil.process_iter(['name']):
+            name = (proc.info['name'] or '').lower()
+            if self._exe is None:
+                if self._name in name:
+                    return proc
+                continue
+            if name != self._name:
+                continue
+            try:
+                if os.path.normcase(proc.exe()) == self._exe:
+                    return proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return None
+
+    def _attach(self, proc: Optional[psutil.Process]):
+        if proc is None:
+            return
+        with self._lock:
+            self._proc = proc
+        if self.on_attach:
+            self.on_attach(proc)
+
+    def _detach(self, proc: psutil.Process):
+        with self._lock:
+            if self._proc is not proc:
+                return
+            self._proc = None
+        if self.on_detach:
+            self.on_detach(proc.pid)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                proc = self._proc
+            if proc is None:
+                self._attach(self.resolve())
+                if self._proc is None:
+                    self._wake.wait(self.poll)
+                    self._wake.clear()
+                continue
+            try:
+                proc.wait(timeout=self.poll)
+            except psutil.TimeoutExpired:
+                if proc.is_running():  # Also catches the PID being reused while we waited
+                    continue
+            except psutil.NoSuchProcess:
+                pass
+            self._detach(proc)
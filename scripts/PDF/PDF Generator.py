@@ -1,5 +1,4 @@
-import pandas as pd
-from fpdf import FPDF
+from invoices import Invoice, InvoiceTemplate, write_atomic
 
 # Parts and prices extracted from all images manually
 parts = [
@@ -21,30 +20,6 @@ parts = [
     ("Labor; Drywall removal and repair, full shower set replacement", 150.00)
 ]
 
-# Create PDF
-pdf = FPDF()
-pdf.add_page()
-pdf.set_font("Arial", size=12)
-pdf.cell(200, 10, txt="Lowe's Parts Invoice", ln=1, align="C")
-pdf.cell(200, 10, txt="", ln=1, align="C")
-
-# Table header
-pdf.set_font("Arial", 'B', 12)
-pdf.cell(150, 10, "Part", border=1)
-pdf.cell(40, 10, "Price ($)", border=1, ln=1)
-pdf.set_font("Arial", size=12)
-
-# Table rows
-for part, price in parts:
-    pdf.cell(150, 10, part, border=1)
-    pdf.cell(40, 10, f"${price:.2f}", border=1, ln=1)
-
-# Total
-pdf.set_font("Arial", 'B', 12)
-total = sum(price for _, price in parts)
-pdf.cell(150, 10, "Total", border=1)
-pdf.cell(40, 10, f"${total:.2f}", border=1, ln=1)
-
-# Save PDF
-pdf.output("Lowe's Parts Invoice.pdf")
-
+# Render through the same template the bulk renderer (invoices.py) uses
+invoice = Invoice("Lowe's Parts Invoice", title="Lowe's Parts Invoice", items=parts)
+write_atomic("Lowe's Parts Invoice.pdf", InvoiceTemplate().render(invoice))
@@ -0,0 +1,55 @@
+"""
+Times LineItemTable on generated statements of increasing size and reports pages/s and memory.
+Usage: python benchmark.py [--rows 1000,10000,100000]
+"""
+import argparse
+import random
+import time
+from fpdf import FPDF
+from table import LineItemTable
+
+WORDS = ("SharkBite", "Max", "1/2-in", "Push-to-Connect", "x", "FNPT", "Female", "Adapter", "Copper", "Type L",
+         "Pipe", "Drop", "Ear", "Elbow", "Streamline", "Lead-Free", "Plumbing", "Solder", "Kobalt", "Cutter")
+
+
+def line_items(count: int, seed: int = 0):
+    """Yields `count` (item, price) rows without ever holding them all."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 30))), round(rng.uniform(1, 250), 2)
+
+
+def rss_mb() -> float:
+    try:
+        import psutil
+    except ImportError:
+        return float('nan')
+    return psutil.Process().memory_info().rss / 1e6
+
+
+def run(rows: int):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("helvetica", size=12)
+    before = rss_mb()
+    start = time.perf_counter()
+    table = LineItemTable(pdf)
+    table.write(line_items(rows))
+    layout = time.perf_counter() - start
+    data = pdf.output()
+    elapsed = time.perf_counter() - start
+    print(f"{rows:>8} {table.pages:>6} {elapsed:>8.2f} {table.pages / elapsed:>8.1f} {rows / layout:>9.0f} "
+          f"{len(data) / 1e6:>7.1f} {rss_mb() - before:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming line-item table writer")
+    parser.add_argument('--rows', default='1000,10000,100000', help='Comma-separated row counts (default: %(default)s)')
+    args = parser.parse_args()
+    print(f"{'rows':>8} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'rows/s':>9} {'PDF MB':>7} {'+RSS MB':>8}")
+    for rows in (int(n) for n in args.rows.split(',')):
+        run(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Render invoices in bulk from a CSV or JSONL job feed.
+
+CSV: one row per line item with columns invoice, item, price and optionally title. Rows of the same
+invoice must be consecutive.
+JSONL: one invoice per line, {"invoice": "...", "title": "...", "items": [["Part", 2.70], ...]}
+(items may also be {"item": ..., "price": ...} objects).
+
+    python invoices.py jobs.csv --out invoices/ --jobs 8
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional, Tuple
+from fpdf import FPDF
+from table import LineItemTable
+
+
+@dataclass
+class Invoice:
+    id: str
+    title: str = "Invoice"
+    items: Iterable[Tuple[str, float]] = field(default_factory=list)  # Any iterable; rendering reads it once
+
+
+@dataclass
+class InvoiceTemplate:
+    """Page layout shared by every invoice. Build it once and reuse it for each render()."""
+    font: str = "helvetica"
+    font_size: int = 12
+    item_width: float = 150
+    price_width: float = 40
+    row_height: float = 10
+    item_header: str = "Part"
+    price_header: str = "Price ($)"
+
+    def __post_init__(self):
+        self._widths = {}  # Measured string widths, shared by every invoice this template renders
+
+    def render(self, invoice: Invoice) -> bytes:
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font(self.font, size=self.font_size)
+        width = self.item_width + self.price_width
+        pdf.cell(width, self.row_height, invoice.title, align="C", new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(self.row_height)
+        table = LineItemTable(pdf, self.item_width, self.price_width, self.row_height, self.item_header,
+                              self.price_header, self.font, self.font_size, widths=self._widths)
+        table.write(invoice.items)
+        return bytes(pdf.output())
+
+
+def _price(value) -> float:
+    return float(str(value).replace("$", "").replace(",", "").strip())
+
+
+def _skip(errors: Optional[list], where: str, e: Exception):
+    print(f"[ERROR] Skipping {where}: {type(e).__name__}: {e}")
+    if errors is not None:
+        errors.append((where, str(e)))
+
+
+def read_csv(path: str, errors: list = None) -> Iterator[Invoice]:
+    with open(path, newline="", encoding="utf-8") as f:
+        current: Optional[Invoice] = None
+        bad = None  # Id of an invoice with a bad row; its remaining rows are dropped too
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            invoice_id = row.get("invoice")  # A row without one can't be pinned on any invoice
+            try:
+                if not invoice_id:
+                    raise KeyError("invoice")
+                if current is None or invoice_id != current.id:
+                    if current is not None and current.id != bad:
+                        yield current
+                    current = Invoice(invoice_id, row.get("title") or "Invoice")
+                current.items.append((row["item"], _price(row["price"])))
+            except (KeyError, ValueError) as e:
+                if invoice_id:
+                    bad = invoice_id
+                _skip(errors, f"{path} line {line}", e)
+        if current is not None and current.id != bad:
+            yield current
+
+
+def read_jsonl(path: str, errors: list = None) -> Iterator[Invoice]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                items = [(i["item"], _price(i["price"])) if isinstance(i, dict) else (i[0], _price(i[1]))
+                         for i in record.get("items", [])]
+                invoice = Invoice(str(record["invoice"]), record.get("title") or "Invoice", items)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                _skip(errors, f"{path} line {line_no}", e)
+                continue
+            yield invoice
+
+
+def read_jobs(path: str, errors: list = None) -> Iterator[Invoice]:
+    """
+    Streams invoices from a .csv or .jsonl/.ndjson feed, one record at a time.
+    Malformed records are reported, appended to `errors` as (location, message) and skipped.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return read_csv(path, errors)
+    if ext in (".jsonl", ".ndjson"):
+        return read_jsonl(path, errors)
+    raise ValueError(f"Unsupported job feed '{path}' (expected .csv or .jsonl)")
+
+
+def output_path(out_dir: str, invoice: Invoice) -> str:
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]+', "_", invoice.id).strip(" .") or "invoice"
+    return os.path.join(out_dir, f"{name}.pdf")
+
+
+def write_atomic(path: str, data: bytes):
+    """Writes to a temp file in the same folder and renames it over `path`, so readers never see half a PDF."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+_template: Optional[InvoiceTemplate] = None  # Per worker process, set by _init_worker
+
+
+def _init_worker(template: InvoiceTemplate):
+    global _template
+    _template = template
+
+
+def _render_job(invoice: Invoice, path: str) -> Optional[str]:
+    """Worker body: render and write one invoice. Returns None, or the error message."""
+    try:
+        write_atomic(path, _template.render(invoice))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def render_all(invoices: Iterator[Invoice], out_dir: str, template: InvoiceTemplate = None, jobs: int = None):
+    """
+    Renders each invoice to out_dir/<invoice id>.pdf on `jobs` worker processes (default: one per CPU).
+    Records are pulled from `invoices` as workers free up, so a feed of any size only keeps the output names in
+    memory. An invoice whose file name is already taken in this run (a repeated id, or ids that sanitize to
+    the same name) fails instead of overwriting the earlier PDF.
+    Returns (rendered, failed) where failed is a list of (invoice id, error).
+    """
+    template = template or InvoiceTemplate()
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    os.makedirs(out_dir, exist_ok=True)
+    rendered, failed = 0, []
+    written = {}  # Output path -> id of the invoice rendered to it
+
+    def collect(invoice_id: str, error: Optional[str]):
+        nonlocal rendered
+        if error:
+            print(f"[ERROR] Invoice {invoice_id}: {error}")
+            failed.append((invoice_id, error))
+        else:
+            rendered += 1
+
+    def claim(invoice: Invoice) -> Optional[str]:
+        """The invoice's output path, or None (and a failure) if another invoice already uses it."""
+        path = output_path(out_dir, invoice)
+        key = os.path.normcase(path)
+        if key in written:
+            collect(invoice.id, f"{path} is already the output of invoice {written[key]!r}")
+            return None
+        written[key] = invoice.id
+        return path
+
+    if jobs == 1:
+        _init_worker(template)
+        for invoice in invoices:
+            path = claim(invoice)
+            if path:
+                collect(invoice.id, _render_job(invoice, path))
+        return rendered, failed
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(template,)) as pool:
+        pending = {}
+        for invoice in invoices:
+            path = claim(invoice)
+            if not path:
+                continue
+            pending[pool.submit(_render_job, invoice, path)] = invoice.id
+            if len(pending) >= jobs * 4:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(pending.pop(future), future.result())
+        for future in list(pending):
+            collect(pending.pop(future), future.result())
+    return rendered, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render one PDF invoice per record of a CSV or JSONL feed")
+    parser.add_argument("feed", help="Job feed (.csv or .jsonl)")
+    parser.add_argument("--out", default="invoices", help="Output folder (default: %(default)s)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    skipped = []
+    try:
+        rendered, failed = render_all(read_jobs(args.feed, skipped), args.out, jobs=args.jobs)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    rate = rendered / elapsed if elapsed > 0 else 0.0
+    print(f"[INFO] Rendered {rendered} invoice(s), {len(failed)} failed, {len(skipped)} bad record(s) skipped "
+          f"in {elapsed:.1f}s ({rate:.1f} invoices/s)")
+    if failed or skipped:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
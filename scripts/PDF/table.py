@@ -0,0 +1,131 @@
+from typing import Dict, Iterable, List, Tuple
+from fpdf import FPDF
+
+
+class LineItemTable:
+    """
+    Writes an item/price table row by row from any iterable, so a 100k-line statement never sits in memory.
+    Item text is word-wrapped using a cache of measured word widths. When the next row doesn't fit, the page
+    ends with its subtotal and the running total carried forward, and the next page repeats the header and
+    brings that total forward. Totals are accumulated while writing; there is no second pass.
+    """
+    MAX_CACHED_WIDTHS = 50_000
+
+    def __init__(self, pdf: FPDF, item_width: float = 150, price_width: float = 40, line_height: float = 10,
+                 item_header: str = "Part", price_header: str = "Price ($)", font: str = "helvetica",
+                 font_size: int = 12, widths: Dict[str, float] = None):
+        """`widths` lets several tables with the same font share one width cache (e.g. across invoices)."""
+        self.pdf = pdf
+        self.item_width = item_width
+        self.price_width = price_width
+        self.line_height = line_height
+        self.item_header = item_header
+        self.price_header = price_header
+        self.font = font
+        self.font_size = font_size
+        self.total = 0.0
+        self.rows = 0
+        self.pages = 0
+        self._page_total = 0.0
+        self._widths: Dict[str, float] = widths if widths is not None else {}
+
+    # Measuring
+
+    def _width(self, text: str) -> float:
+        width = self._widths.get(text)
+        if width is None:
+            if len(self._widths) >= self.MAX_CACHED_WIDTHS:
+                self._widths.clear()
+            width = self._widths[text] = self.pdf.get_string_width(text)
+        return width
+
+    def wrap(self, text: str) -> List[str]:
+        """Greedy word wrap to the item column, splitting words that are wider than the column on their own."""
+        limit = self.item_width - 2 * self.pdf.c_margin
+        space = self._width(" ")
+        lines, line, used = [], [], 0.0
+        for word in text.split():
+            width = self._width(word)
+            if width > limit:
+                if line:
+                    lines.append(" ".join(line))
+                    line, used = [], 0.0
+                chunk = ""
+                for ch in word:
+                    if chunk and self._width(chunk + ch) > limit:
+                        lines.append(chunk)
+                        chunk = ""
+                    chunk += ch
+                word, width = chunk, self._width(chunk)
+            if line and used + space + width > limit:
+                lines.append(" ".join(line))
+                line, used = [], 0.0
+            used += (space if line else 0.0) + width
+            line.append(word)
+        if line or not lines:
+            lines.append(" ".join(line))
+        return lines
+
+    # Layout
+
+    @property
+    def _bottom(self) -> float:
+        # Leave room for the subtotal and carried-forward rows
+        return self.pdf.h - self.pdf.b_margin - 2 * self.line_height
+
+    def _row(self, item: str, price: str, style: str = ""):
+        self.pdf.set_font(self.font, style, self.font_size)
+        self.pdf.cell(self.item_width, self.line_height, item, border=1)
+        self.pdf.cell(self.price_width, self.line_height, price, border=1, align="R", new_x="LMARGIN", new_y="NEXT")
+
+    def _header(self):
+        self._row(self.item_header, self.price_header, "B")
+        if self.pages > 1:
+            self._row("Brought forward", f"${self.total:.2f}", "I")
+
+    def _break_page(self):
+        self._row("Page subtotal", f"${self._page_total:.2f}", "I")
+        self._row("Carried forward", f"${self.total:.2f}", "B")
+        self.pdf.add_page()
+        self.pages += 1
+        self._page_total = 0.0
+        self._header()
+
+    def write(self, items: Iterable[Tuple[str, float]]) -> float:
+        """Write every (item, price) and the closing total row. Returns the total."""
+        pdf = self.pdf
+        auto_break, margin = pdf.auto_page_break, pdf.b_margin
+        pdf.set_auto_page_break(False)
+        try:
+            self.pages = max(self.pages, 1)
+            self._header()
+            max_lines = max(1, int((self._bottom - pdf.t_margin - 3 * self.line_height) // self.line_height))
+            for item, price in items:
+                pdf.set_font(self.font, "", self.font_size)
+                lines = self.wrap(item)
+                if len(lines) > max_lines:
+                    lines = lines[:max_lines - 1] + [lines[max_lines - 1] + " ..."]
+                height = len(lines) * self.line_height
+                if pdf.y + height > self._bottom:
+                    self._break_page()
+                    pdf.set_font(self.font, "", self.font_size)
+                # Body rows use text() rather than cell(): same output, a fraction of the cost per line
+                x, y = pdf.x, pdf.y
+                pdf.rect(x, y, self.item_width, height)
+                pdf.rect(x + self.item_width, y, self.price_width, height)
+                baseline = 0.5 * self.line_height + 0.3 * pdf.font_size
+                for i, line in enumerate(lines):
+                    pdf.text(x + pdf.c_margin, y + i * self.line_height + baseline, line)
+                amount = f"${price:.2f}"
+                amount_width = sum(self._width(ch) for ch in amount)
+                pdf.text(x + self.item_width + self.price_width - pdf.c_margin - amount_width, y + baseline, amount)
+                pdf.set_xy(x, y + height)
+                self.total += price
+                self._page_total += price
+                self.rows += 1
+            if self.pages > 1:
+                self._row("Page subtotal", f"${self._page_total:.2f}", "I")
+            self._row("Total", f"${self.total:.2f}", "B")
+        finally:
+            pdf.set_auto_page_break(auto_break, margin)
+        return self.total
@@ -1,15 +1,18 @@
 import os
+import shutil
 import subprocess
 import pathlib
 import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+from .cache import CACHE_NAME, BuildCache
 
-# Adjust these two constants depending on your OS:
-# • On Windows (ImageMagick 7+), use "magick" rather than "convert" 
-# • On Linux/macOS, use "convert"
-IMAGEMAGICK_CMD = "magick"     # ← Windows: typically "magick"
-# IMAGEMAGICK_CMD = "convert"  # ← Linux/macOS: if `convert` is on your PATH
-
-POTRACE_CMD = "potrace"        # Potrace must be in your PATH
+POTRACE_CMD = "potrace"        # Used when the potrace CLI is on your PATH
+TRACERS = ("auto", "cli", "bindings")
+# auto: the potrace CLI if installed (fastest), else the potracer bindings (pip install potracer)
+POTRACE_PARAMS = {"turdsize": 2, "alphamax": 1.0, "opttolerance": 0.2}  # Potrace's defaults, passed explicitly to both
 
 # Paths
 root_path = pathlib.Path(__file__).parent
@@ -19,62 +22,191 @@ LAYERS_PATH     = root_path / "layers"
 # Make sure the layers folder exists
 LAYERS_PATH.mkdir(parents=True, exist_ok=True)
 
-def png_to_svg(png_path: pathlib.Path, svg_path: pathlib.Path, invert: bool = False):
+def extract_alpha(png_path: pathlib.Path, invert: bool = False) -> np.ndarray:
     """
-    1. Extracts the alpha channel from `png_path` into a PGM file.
-    2. Optionally inverts (negates) the alpha channel.
-    3. Runs Potrace on that PGM to create an SVG at `svg_path`.
-    4. Deletes the intermediate PGM.
+    Returns the alpha channel of `png_path` as a uint8 array (255 = opaque), negated if `invert`.
+    Images without transparency come out fully opaque, as with `magick -alpha extract`.
     """
-    pgm_path = png_path.with_suffix(".pgm")
-
-    # Build ImageMagick command
-    cmd = [
-        IMAGEMAGICK_CMD,
-        str(png_path),
-        "-alpha", "extract"
-    ]
-    if invert:
-        cmd.append("-negate")
-    cmd.append(str(pgm_path))
+    with Image.open(png_path) as image:
+        alpha = np.asarray(image.convert("RGBA").getchannel("A"))
+    return 255 - alpha if invert else alpha
+
+def to_pgm(gray: np.ndarray) -> bytes:
+    height, width = gray.shape
+    return b"P5\n%d %d\n255\n" % (width, height) + np.ascontiguousarray(gray, dtype=np.uint8).tobytes()
 
+def trace_cli(gray: np.ndarray) -> bytes:
+    """Pipes `gray` to the potrace CLI as a PGM on stdin and returns the SVG it writes to stdout."""
     try:
-        subprocess.run(cmd, check=True)
+        params = ["-t", str(POTRACE_PARAMS["turdsize"]), "-a", str(POTRACE_PARAMS["alphamax"]),
+                  "-O", str(POTRACE_PARAMS["opttolerance"])]
+        result = subprocess.run([POTRACE_CMD, "-s", *params, "-o", "-", "-"], input=to_pgm(gray),
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    except FileNotFoundError as e:
+        raise RuntimeError(f"'{POTRACE_CMD}' not found on PATH") from e
     except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"ImageMagick failed to produce PGM from {png_path}") from e
+        raise RuntimeError(f"Potrace failed: {e.stderr.decode(errors='replace').strip()}") from e
+    return result.stdout
+
+def trace_bindings(gray: np.ndarray) -> bytes:
+    """
+    Traces `gray` in-process with the potracer bindings, using the CLI's defaults, and renders the SVG.
+    Dark pixels (< 128) are the shape, as with the CLI.
+    """
+    import potrace
+
+    height, width = gray.shape
+    path = potrace.Bitmap(gray).trace(opticurve=True, **POTRACE_PARAMS)
+    parts = []
+    for curve in path:
+        start = curve.start_point
+        parts.append(f"M{start.x:.3f},{start.y:.3f}")
+        for segment in curve:
+            end = segment.end_point
+            if segment.is_corner:
+                parts.append(f"L{segment.c.x:.3f},{segment.c.y:.3f}L{end.x:.3f},{end.y:.3f}")
+            else:
+                c1, c2 = segment.c1, segment.c2
+                parts.append(f"C{c1.x:.3f},{c1.y:.3f} {c2.x:.3f},{c2.y:.3f} {end.x:.3f},{end.y:.3f}")
+        parts.append("Z")
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">\n'
+        f'<path fill="#000000" fill-rule="evenodd" d="{"".join(parts)}"/>\n</svg>\n'
+    ).encode("utf-8")
 
+def resolve_tracer(tracer: str = "auto") -> str:
+    if tracer not in TRACERS:
+        raise ValueError(f"Unknown tracer '{tracer}' (expected one of {', '.join(TRACERS)})")
+    if tracer != "auto":
+        return tracer
+    if shutil.which(POTRACE_CMD):
+        return "cli"
     try:
-        subprocess.run(
-            [
-                POTRACE_CMD,
-                str(pgm_path),
-                "-s",
-                "-o", str(svg_path)
-            ],
-            check=True
-        )
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Potrace failed to trace {pgm_path} into {svg_path}") from e
+        import potrace  # noqa: F401
+    except ImportError:
+        raise RuntimeError(f"Neither '{POTRACE_CMD}' on PATH nor the potracer package is available")
+    return "bindings"
 
-    pgm_path.unlink()
+def png_to_svg(png_path: pathlib.Path, svg_path: pathlib.Path, invert: bool = False, tracer: str = "auto"):
+    """
+    1. Extracts the alpha channel from `png_path` in memory, optionally inverted.
+    2. Traces it with Potrace (CLI over stdin/stdout, or the potracer bindings).
+    3. Writes the SVG to `svg_path`, creating its folder if needed. No intermediate files are created.
+    """
+    gray = extract_alpha(png_path, invert)
+    svg = trace_cli(gray) if resolve_tracer(tracer) == "cli" else trace_bindings(gray)
+    svg_path = pathlib.Path(svg_path)
+    svg_path.parent.mkdir(parents=True, exist_ok=True)
+    svg_path.write_bytes(svg)
+
+def _convert(png_path: pathlib.Path, svg_path: pathlib.Path, invert: bool, tracer: str):
+    """Runs one conversion and returns None, or the error message if it failed."""
+    try:
+        png_to_svg(png_path, svg_path, invert=invert, tracer=tracer)
+    except Exception as e:
+        return str(e)
+    return None
 
-def batch_convert(input_dir, output_dir, invert=False):
+def batch_convert(input_dir, output_dir, invert=False, jobs=None, tracer="auto", recursive=False,
+                  force=False, watching=False):
+    """
+    Converts the PNGs in input_dir (and its subfolders, mirrored under output_dir, if `recursive`),
+    `jobs` files at a time (default: one per CPU). PNGs whose content and options match the last build
+    are skipped unless `force`. Results are reported in file order; a failed file is reported and skipped.
+    `watching` also skips files that failed and haven't changed since, and prints nothing when idle.
+    Returns (converted, failed) lists of input paths.
+    """
     input_dir = pathlib.Path(input_dir)
     output_dir = pathlib.Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
-    for file in input_dir.glob("*.png"):
-        svg_path = output_dir / f"{file.stem}.svg"
-        print(f"→ {file.name} → {svg_path.name}")
-        png_to_svg(file, svg_path, invert=invert)
-    print("All done!")
+    files = sorted(input_dir.rglob("*.png") if recursive else input_dir.glob("*.png"))
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    tracer = resolve_tracer(tracer)
+    converted, failed = [], []
+    start = time.perf_counter()
+
+    cache = BuildCache(output_dir / CACHE_NAME)
+    options = {"invert": invert, "tracer": tracer, **POTRACE_PARAMS}
+    pending = []
+    for file in files:
+        rel = file.relative_to(input_dir)
+        svg_path = output_dir / rel.with_suffix(".svg")
+        try:
+            key = cache.key(rel.as_posix(), file, options)
+        except OSError:
+            continue  # Deleted or replaced while scanning; the next run picks it up
+        if not force and cache.fresh(rel.as_posix(), key, svg_path, skip_failed=watching):
+            continue
+        pending.append((file, svg_path, rel.as_posix(), key))
+    if watching and not pending:
+        return converted, failed
+
+    def report(file, svg_path, rel, key, error):
+        if error:
+            print(f"✗ {rel}: {error}")
+            failed.append(file)
+        else:
+            print(f"→ {rel} → {svg_path.relative_to(output_dir).as_posix()}")
+            converted.append(file)
+        cache.record(rel, key, ok=not error)
+
+    try:
+        if jobs == 1 or len(pending) < 2:
+            for file, svg_path, rel, key in pending:
+                report(file, svg_path, rel, key, _convert(file, svg_path, invert, tracer))
+        else:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                futures = [pool.submit(_convert, file, svg_path, invert, tracer) for file, svg_path, _, _ in pending]
+                for (file, svg_path, rel, key), future in zip(pending, futures):
+                    try:
+                        error = future.result()
+                    except Exception as e:  # Worker process died
+                        error = str(e) or type(e).__name__
+                    report(file, svg_path, rel, key, error)
+    finally:
+        cache.save()
+
+    elapsed = time.perf_counter() - start
+    rate = len(pending) / elapsed if elapsed > 0 else 0.0
+    print(f"All done! {len(converted)} converted, {len(files) - len(pending)} unchanged, {len(failed)} failed "
+          f"in {elapsed:.1f}s ({rate:.1f} files/s)")
+    return converted, failed
+
+def watch(input_dir, output_dir, interval=1.0, force=False, **options):
+    """Converts what changed (everything if `force`), then polls input_dir and reconverts PNGs as they are saved."""
+    batch_convert(input_dir, output_dir, force=force, **options)
+    print(f"Watching {input_dir} for changes (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(interval)
+            batch_convert(input_dir, output_dir, watching=True, **options)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
 
 def main():
     parser = argparse.ArgumentParser(description="Batch convert PNGs to SVGs using alpha channel (optionally inverted)")
     parser.add_argument('--invert', action='store_true', help='Invert (negate) the alpha channel before tracing')
     parser.add_argument('--in', dest='input_dir', default=os.getcwd(), help='Input folder (default: current directory)')
     parser.add_argument('--out', dest='output_dir', default=os.getcwd(), help='Output folder (default: current directory)')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Files converted at once (default: CPU count)')
+    parser.add_argument('--tracer', choices=TRACERS, default='auto',
+                        help='potrace CLI, potracer bindings, or auto: the CLI if installed (default: auto)')
+    parser.add_argument('--recursive', '-r', action='store_true', help='Include subfolders, mirrored in the output folder')
+    parser.add_argument('--force', action='store_true', help='Reconvert everything, ignoring the build cache')
+    parser.add_argument('--watch', action='store_true', help='Keep running and reconvert PNGs when they change')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between checks in watch mode (default: 1)')
     args = parser.parse_args()
-    batch_convert(args.input_dir, args.output_dir, invert=args.invert)
+    options = dict(invert=args.invert, jobs=args.jobs, tracer=args.tracer, recursive=args.recursive, force=args.force)
+    try:
+        if args.watch:
+            watch(args.input_dir, args.output_dir, interval=args.interval, **options)
+            return
+        _, failed = batch_convert(args.input_dir, args.output_dir, **options)
+    except RuntimeError as e:
+        parser.error(str(e))
+    if failed:
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
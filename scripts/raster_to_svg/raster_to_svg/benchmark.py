@@ -0,0 +1,61 @@
+"""
+Times batch_convert over generated PNGs at several --jobs settings.
+Usage: python -m raster_to_svg.benchmark [--count 200] [--size 256] [--jobs 1,4,8] [--tracer auto]
+Needs the potrace CLI or the potracer bindings, like the converter.
+"""
+import argparse
+import contextlib
+import io
+import os
+import pathlib
+import random
+import shutil
+import tempfile
+import time
+from PIL import Image, ImageDraw
+from .__main__ import TRACERS, batch_convert
+
+
+def make_pngs(folder: pathlib.Path, count: int, size: int, seed: int = 0):
+    """Writes `count` RGBA icons of random filled shapes on a transparent background."""
+
+    rng = random.Random(seed)
+    folder.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        for _ in range(rng.randint(3, 8)):
+            x0, y0 = rng.randrange(size), rng.randrange(size)
+            x1, y1 = rng.randint(x0, size), rng.randint(y0, size)
+            fill = (0, 0, 0, rng.choice((128, 255)))
+            shape = rng.choice((draw.ellipse, draw.rectangle))
+            shape((x0, y0, x1, y1), fill=fill)
+        image.save(folder / f"icon_{i:05d}.png")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark raster-to-svg over synthetic PNGs")
+    parser.add_argument('--count', type=int, default=200, help='Number of PNGs (default: 200)')
+    parser.add_argument('--size', type=int, default=256, help='Width and height in pixels (default: 256)')
+    parser.add_argument('--jobs', default=f"1,{os.cpu_count() or 1}", help='Comma-separated --jobs values (default: 1,CPU count)')
+    parser.add_argument('--tracer', choices=TRACERS, default='auto', help='(default: auto)')
+    args = parser.parse_args()
+
+    work = pathlib.Path(tempfile.mkdtemp(prefix="raster-bench-"))
+    try:
+        make_pngs(work / "in", args.count, args.size)
+        print(f"{args.count} PNGs, {args.size}x{args.size}")
+        print(f"{'jobs':>5} {'seconds':>8} {'files/s':>8} {'failed':>6}")
+        for jobs in (int(j) for j in args.jobs.split(',')):
+            out = work / f"out-{jobs}"
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                converted, failed = batch_convert(work / "in", out, jobs=jobs, tracer=args.tracer)
+            elapsed = time.perf_counter() - start
+            print(f"{jobs:>5} {elapsed:>8.2f} {len(converted) / elapsed:>8.1f} {len(failed):>6}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
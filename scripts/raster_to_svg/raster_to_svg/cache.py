@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import pathlib
+
+CACHE_NAME = ".svgcache.json"
+CACHE_VERSION = 1  # Bump when a code change alters the SVGs produced for the same input and options
+
+
+def file_digest(path: pathlib.Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class BuildCache:
+    """
+    Remembers, per source PNG (relative path), the content hash and conversion options its SVG was built from.
+    Stored as JSON in the output folder. The content hash is only recomputed when size or mtime changed.
+    """
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.entries = {}
+        self._stats = {}
+        if self.path.is_file():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == CACHE_VERSION:
+                    self.entries = data.get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Ignoring unreadable cache {self.path}: {e}")
+
+    def key(self, rel: str, png_path: pathlib.Path, options: dict) -> str:
+        """Build key for `png_path` under `options`: changes when either the content or the options change."""
+        st = png_path.stat()
+        entry = self.entries.get(rel)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            digest = entry["digest"]
+        else:
+            digest = file_digest(png_path)
+        self._stats[rel] = (st.st_size, st.st_mtime_ns, digest)
+        return hashlib.blake2b(json.dumps([digest, options], sort_keys=True).encode(), digest_size=16).hexdigest()
+
+    def fresh(self, rel: str, key: str, svg_path: pathlib.Path, skip_failed: bool = False) -> bool:
+        """True if the SVG for this key is already built (or, with skip_failed, already failed to build)."""
+        entry = self.entries.get(rel)
+        if not entry or entry["key"] != key:
+            return False
+        return svg_path.exists() if entry["ok"] else skip_failed
+
+    def record(self, rel: str, key: str, ok: bool):
+        size, mtime_ns, digest = self._stats[rel]
+        self.entries[rel] = {"size": size, "mtime_ns": mtime_ns, "digest": digest, "key": key, "ok": ok}
+
+    def save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "entries": self.entries}), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -12,7 +12,10 @@ setup(
         ],
     },
     python_requires='>=3.6',
-    install_requires=[],
+    install_requires=['Pillow', 'numpy'],
+    extras_require={
+        'bindings': ['potracer'],  # Trace in-process when the potrace CLI isn't installed
+    },
     include_package_data=True,
     classifiers=[
         'Programming Language :: Python :: 3',